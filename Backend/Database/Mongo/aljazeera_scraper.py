@@ -1,20 +1,8 @@
-import os
-import re
-import requests
-from datetime import datetime
-from bs4 import BeautifulSoup
-from pymongo import MongoClient
-import concurrent.futures
-from dotenv import load_dotenv
+import html_parser
 from dateutil import parser, tz
-
-load_dotenv()
-
-# ====== MongoDB Connection ======
-MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
-db = client["news_db"]
-collection = db["articles"]
+from crawl_engine import SiteAdapter, run_crawl
+from html_parser import css
+from image_sets import compact_images
 
 # ====== Al Jazeera Section URLs ======
 URLS = [
@@ -30,6 +18,11 @@ URLS = [
     "https://www.aljazeera.com/tag/science-and-technology/"
 ]
 
+# ====== Al Jazeera Feeds ======
+FEEDS = [
+    "https://www.aljazeera.com/xml/rss/all.xml"
+]
+
 headers = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -38,114 +31,81 @@ headers = {
     )
 }
 
-def scrape_section(url):
-    try:
-        print(f"🔍 Scraping section: {url}")
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        out = []
-        # Look for all <a> tags with proper article href
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            # Filter for article links only
-            if href.startswith("/") and any(href.startswith(p) for p in ["/news/", "/sports/", "/opinions/"]):
-                full_url = "https://www.aljazeera.com" + href
-                out.append({"url": full_url})
-        print(f"✅ Found {len(out)} articles in {url}")
-        return out
-
-    except Exception as e:
-        print(f"❌ Error scraping section {url}: {e}")
-        return []
-
-def get_full_article(article):
-    url = article["url"]
-    try:
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        # --- Title ---
-        h1 = soup.find("h1")
-        title = h1.get_text(strip=True) if h1 else None
-
-        # --- Date ---
-        pub_date = None
-        date_tag = soup.select_one("div.article-dates div.date-simple span")
-        if date_tag and "Published On" in date_tag.text:
-            txt = date_tag.text.replace("Published On", "").strip()
-            dt = parser.parse(txt, fuzzy=True)
-            pub_date = dt.astimezone(tz.gettz("Asia/Kuala_Lumpur")).replace(tzinfo=None)
-
-        # --- Content ---
-        paras = soup.select("div.wysiwyg p")
-        content = "\n".join(p.get_text(strip=True) for p in paras if p.get_text(strip=True))
-
-        # --- Images ---
-        images = []
-        for img in soup.select("figure img[src]"):
-            src = img.get("src")
-            if src and src.startswith("/"):
-                src = "https://www.aljazeera.com" + src
-            if src:
-                images.append(src)
-
-        # Skip if essential data missing
-        if not title or not content:
-            print(f"⚠️ Skipping (no title/content): {url}")
-            return
-
-        doc = {
-            "title":   title,
-            "url":     url,
-            "content": content,
-            "date":    pub_date,
-            "images":  images
-        }
-
-        clean = re.escape(url.split("?")[0])
-        res = collection.update_one(
-            {"url": {"$regex": f"^{clean}"}},
-            {"$setOnInsert": doc},
-            upsert=True
-        )
-        if res.upserted_id:
-            print(f"✅ Saved: {title[:60]}...")
-            return True
-        return False
-
-    except Exception as e:
-        print(f"❌ Error processing article {url}: {e}")
-        return False
-    
+# ====== Pre-compiled Selectors ======
+SELECTORS = {
+    "links":  css("a[href]"),
+    "title":  css("h1"),
+    "date":   css("div.article-dates div.date-simple span"),
+    "paras":  css("div.wysiwyg p"),
+    "images": css("figure img[src]"),
+}
+
+def parse_section(html, url):
+    page = html_parser.parse(html)
+
+    out = []
+    # Look for all <a> tags with proper article href
+    for a in page.select(SELECTORS["links"]):
+        href = page.attr(a, "href")
+        # Filter for article links only
+        if href.startswith("/") and any(href.startswith(p) for p in ["/news/", "/sports/", "/opinions/"]):
+            full_url = "https://www.aljazeera.com" + href
+            out.append({"url": full_url})
+    return out
+
+def parse_article(html, url):
+    page = html_parser.parse(html)
+
+    # --- Title ---
+    h1 = page.select_one(SELECTORS["title"])
+    title = page.text(h1) if h1 is not None else None
+
+    # --- Date ---
+    pub_date = None
+    date_tag = page.select_one(SELECTORS["date"])
+    if date_tag is not None and "Published On" in page.raw_text(date_tag):
+        txt = page.raw_text(date_tag).replace("Published On", "").strip()
+        dt = parser.parse(txt, fuzzy=True)
+        pub_date = dt.astimezone(tz.gettz("Asia/Kuala_Lumpur")).replace(tzinfo=None)
+
+    # --- Content ---
+    paras = page.select(SELECTORS["paras"])
+    content = "\n".join(t for t in (page.text(p) for p in paras) if t)
+
+    # --- Images ---
+    candidates = []
+    for img in page.select(SELECTORS["images"]):
+        src = page.attr(img, "src")
+        if src and src.startswith("/"):
+            src = "https://www.aljazeera.com" + src
+        if src:
+            candidates.append((src, None))
+    images, image = compact_images(candidates)
+
+    # Skip if essential data missing
+    if not title or not content:
+        return None
+
+    return {
+        "title":   title,
+        "url":     url,
+        "content": content,
+        "date":    pub_date,
+        "images":  images,
+        "image":   image
+    }
+
+ADAPTER = SiteAdapter(
+    name="Al Jazeera",
+    urls=URLS,
+    headers=headers,
+    parse_section=parse_section,
+    parse_article=parse_article,
+    feeds=FEEDS
+)
+
 def scrape_all_sections():
-    seen = set()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as exec1:
-        all_lists = exec1.map(scrape_section, URLS)
-        all_articles = [item for sub in all_lists for item in sub]
-
-    if not all_articles:
-        print("⚠️ No articles found!")
-        return
-
-    # Deduplicate
-    unique = []
-    for art in all_articles:
-        clean = art["url"].split("?")[0]
-        if clean not in seen:
-            seen.add(clean)
-            unique.append(art)
-    
-    print(f"🔎 Total unique articles to process: {len(unique)}")
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as exec2:
-        results = list(exec2.map(get_full_article, unique))
-
-    saved_count = sum(1 for r in results if r)
-    print(f"✅ Scraping finished. Articles saved: {saved_count} / {len(unique)}")
-    print("🎉 Al Jazeera scraping complete.")
+    run_crawl([ADAPTER])
 
 if __name__ == "__main__":
     scrape_all_sections()
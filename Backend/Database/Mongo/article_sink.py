@@ -0,0 +1,93 @@
+import asyncio
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+BATCH_SIZE     = 200
+FLUSH_INTERVAL = 2.0  # seconds
+
+
+class ArticleSink:
+    """Collects parsed articles from every fetcher and writes them in bulk.
+
+    Each put() waits until the batch holding its document is flushed and
+    returns True when the document was newly inserted, False when it was
+    already stored and None when the write failed; the engine
+    dead-letters failed documents, as the feed or section that listed
+    them may not list them again. A batch is flushed as soon as it
+    reaches batch_size, or every flush_interval seconds.
+    """
+
+    def __init__(self, collection, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.pending = set()
+        self.timer = None
+        self.totals = {"flushes": 0, "inserted": 0, "matched": 0, "errors": 0}
+
+    async def start(self):
+        self.timer = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        await self.flush()
+        if self.pending:
+            await asyncio.gather(*self.pending)
+
+    async def put(self, doc):
+        future = asyncio.get_running_loop().create_future()
+        self.buffer.append((doc, future))
+        if len(self.buffer) >= self.batch_size:
+            await self.flush()
+        return await future
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        task = asyncio.create_task(self._write(batch))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        await task
+
+    async def _write(self, batch):
+        ops = [
+            UpdateOne({"url_key": doc["url_key"]}, {"$setOnInsert": doc}, upsert=True)
+            for doc, _ in batch
+        ]
+        inserted_at, failed_at = set(), set()
+        try:
+            res = await asyncio.to_thread(self.collection.bulk_write, ops, ordered=False)
+            inserted_at = set(res.upserted_ids)
+        except BulkWriteError as e:
+            inserted_at = {u["index"] for u in e.details.get("upserted", [])}
+            # Duplicate keys only mean a concurrent writer inserted the URL first
+            failed_at = {err["index"] for err in e.details.get("writeErrors", []) if err.get("code") != 11000}
+        except Exception as e:
+            print(f"❌ Bulk write of {len(batch)} articles failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+            self.totals["errors"] += len(batch)
+            return
+
+        inserted, errors = len(inserted_at), len(failed_at)
+        matched = len(batch) - inserted - errors
+        self.totals["flushes"] += 1
+        self.totals["inserted"] += inserted
+        self.totals["matched"] += matched
+        self.totals["errors"] += errors
+        print(f"💾 Flushed {len(batch)} articles: {inserted} inserted, {matched} already stored"
+              + (f", {errors} failed" if errors else ""))
+
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(None if i in failed_at else i in inserted_at)
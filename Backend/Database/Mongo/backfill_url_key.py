@@ -0,0 +1,61 @@
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+from dotenv import load_dotenv
+import os
+import re
+import sys
+from url_normalizer import HOST_ALIASES, normalize_url
+
+load_dotenv()
+
+# MongoDB Connection
+client = MongoClient(os.getenv("MONGO_URI"))
+db = client["news_db"]
+collection = db["articles"]
+
+def backfill_url_keys(batch_size=500, rekey=False):
+    """Stamp url_key on articles stored before it existed.
+
+    With rekey=True, re-key articles whose url_key still uses an outlet
+    host alias instead.
+
+    Legacy duplicates of an already-keyed URL are left without a key and
+    counted; remove them with temp_change.remove_duplicates.
+    """
+    collection.create_index(
+        "url_key",
+        unique=True,
+        partialFilterExpression={"url_key": {"$exists": True}}
+    )
+
+    updated, duplicates = 0, 0
+    batch = []
+
+    def flush():
+        nonlocal updated, duplicates
+        if not batch:
+            return
+        try:
+            res = collection.bulk_write(batch, ordered=False)
+            updated += res.modified_count
+        except BulkWriteError as e:
+            updated += e.details.get("nModified", 0)
+            duplicates += sum(1 for err in e.details.get("writeErrors", []) if err.get("code") == 11000)
+        batch.clear()
+
+    query = {"url_key": {"$exists": False}, "url": {"$exists": True}}
+    if rekey:
+        # Keys built before HOST_ALIASES folded these hosts; anchored so the url_key index is used
+        query = {"url_key": {"$in": [re.compile(f"^https://{re.escape(host)}/") for host in HOST_ALIASES]}}
+    for doc in collection.find(query, {"url": 1}):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"url_key": normalize_url(doc["url"])}}))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    print(f"✅ url_key set on {updated} articles")
+    if duplicates:
+        print(f"⚠️ {duplicates} legacy duplicates left without url_key")
+
+if __name__ == "__main__":
+    backfill_url_keys(rekey="--rekey" in sys.argv)
@@ -0,0 +1,25 @@
+import bbc_scraper
+import cnn_scraper
+import aljazeera_scraper
+import theguardian_scraper
+import skynews_scraper
+from crawl_engine import run_crawl
+
+# ====== Registered Outlets ======
+ADAPTERS = [
+    bbc_scraper.ADAPTER,
+    cnn_scraper.ADAPTER,
+    aljazeera_scraper.ADAPTER,
+    theguardian_scraper.ADAPTER,
+    skynews_scraper.ADAPTER,
+]
+
+def crawl_all():
+    """Crawl every outlet in one process on a single event loop."""
+    results = run_crawl(ADAPTERS)
+    total_saved = sum(r["saved"] for r in results)
+    print(f"🎉 All outlets complete. Articles saved: {total_saved}")
+    return results
+
+if __name__ == "__main__":
+    crawl_all()
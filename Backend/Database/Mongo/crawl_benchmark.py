@@ -0,0 +1,145 @@
+import io
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from urllib.parse import urlsplit
+from crawl_all import ADAPTERS
+from crawl_engine import CrawlEngine, PER_HOST_LIMIT, TOTAL_LIMIT, REQUEST_TIMEOUT
+from crawl_scheduler import Scheduler
+from fixture_store import FixtureStore
+from transports import HttpTransport, ReplayTransport, RecordingTransport
+
+ARTICLE_FIELDS = ("title", "date", "content", "images", "image")
+
+
+class CollectingSink:
+    """Stands in for ArticleSink so recording and benchmarking never touch Mongo."""
+
+    def __init__(self):
+        self.docs = []
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def put(self, doc):
+        self.docs.append(doc)
+        return True
+
+
+class CountingTransport:
+    def __init__(self, inner):
+        self.inner = inner
+        self.requests = 0
+
+    async def start(self):
+        await self.inner.start()
+
+    async def close(self):
+        await self.inner.close()
+
+    async def get(self, url, headers, kind):
+        self.requests += 1
+        return await self.inner.get(url, headers, kind)
+
+
+def select_adapters(names):
+    if not names:
+        return ADAPTERS
+    wanted = {n.lower() for n in names}
+    return [a for a in ADAPTERS if a.name.lower().replace(" ", "") in wanted]
+
+def outlet_pages(store, adapter, kind):
+    """Recorded pages of one kind whose host belongs to the adapter."""
+    hosts = {urlsplit(u).netloc for u in adapter.urls}
+    return [url for url in store.urls(kind) if urlsplit(url).netloc in hosts]
+
+async def offline_crawl(adapter, transport, rate_limited=True):
+    """Crawl one outlet without Mongo and with throwaway crawl state."""
+    scheduler = Scheduler(PER_HOST_LIMIT) if rate_limited else Scheduler(PER_HOST_LIMIT, rate=None)
+    with tempfile.TemporaryDirectory() as state_dir:
+        engine = CrawlEngine(transport=transport, sink=CollectingSink(), scheduler=scheduler,
+                             collection=None, state_dir=state_dir)
+        async with engine:
+            return await engine.crawl_site(adapter)
+
+def record(out_dir, adapters):
+    """Crawl live and save every section and article response into out_dir."""
+    store = FixtureStore(out_dir)
+    for adapter in adapters:
+        live = HttpTransport(TOTAL_LIMIT, PER_HOST_LIMIT, REQUEST_TIMEOUT)
+        asyncio.run(offline_crawl(adapter, RecordingTransport(live, store)))
+    print(f"📼 Fixture store at {out_dir} now holds {len(store)} pages")
+
+def parse_stats(store, adapter):
+    """Parse ms per page and article field coverage for recorded pages."""
+    parse_ms, pages = 0.0, 0
+    filled = {field: 0 for field in ARTICLE_FIELDS}
+    articles = 0
+
+    for kind, fn in (("section", adapter.parse_section), ("article", adapter.parse_article)):
+        for url in outlet_pages(store, adapter, kind):
+            status, headers, body = store.load(url)
+            html = body.decode("utf-8", errors="replace")
+            start = time.perf_counter()
+            try:
+                result = fn(html, url)
+            except Exception as e:
+                print(f"❌ {adapter.name} failed to parse {url}: {e}")
+                result = None
+            parse_ms += (time.perf_counter() - start) * 1000
+            pages += 1
+
+            if kind == "article":
+                articles += 1
+                for field in ARTICLE_FIELDS:
+                    if result and result.get(field):
+                        filled[field] += 1
+
+    coverage = {field: (filled[field] / articles if articles else 0.0) for field in ARTICLE_FIELDS}
+    return pages, (parse_ms / pages if pages else 0.0), coverage
+
+def benchmark(store_dir, adapters):
+    store = FixtureStore(store_dir)
+    if not len(store):
+        sys.exit(f"❌ No recorded pages in {store_dir}")
+
+    rows = []
+    for adapter in adapters:
+        transport = CountingTransport(ReplayTransport(store))
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            asyncio.run(offline_crawl(adapter, transport, rate_limited=False))
+        elapsed = time.perf_counter() - start
+
+        pages, parse_ms, coverage = parse_stats(store, adapter)
+        if pages:
+            rate = transport.requests / elapsed if elapsed else 0.0
+            rows.append((adapter.name, transport.requests, rate, parse_ms, coverage))
+
+    print(f"{'outlet':<14} {'pages':>6} {'pages/s':>9} {'parse ms':>9} "
+          + " ".join(f"{f:>8}" for f in ARTICLE_FIELDS))
+    for name, requests, rate, parse_ms, coverage in rows:
+        print(f"{name:<14} {requests:>6} {rate:>9.1f} {parse_ms:>9.2f} "
+              + " ".join(f"{coverage[f]:>8.0%}" for f in ARTICLE_FIELDS))
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Record scraper fixtures or benchmark the scrapers against them.")
+    sub = ap.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="crawl live and save responses")
+    rec.add_argument("store")
+    rec.add_argument("outlets", nargs="*", help="e.g. bbc cnn skynews (default: all)")
+    run = sub.add_parser("run", help="replay a fixture store and report speed and coverage")
+    run.add_argument("store")
+    run.add_argument("outlets", nargs="*")
+    args = ap.parse_args()
+
+    if args.command == "record":
+        record(args.store, select_adapters(args.outlets))
+    else:
+        benchmark(args.store, select_adapters(args.outlets))
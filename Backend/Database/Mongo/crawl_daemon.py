@@ -0,0 +1,163 @@
+import os
+import time
+import signal
+import asyncio
+from datetime import datetime
+from aiohttp import web
+from crawl_all import ADAPTERS
+from crawl_engine import CrawlEngine
+
+# ====== Schedule (seconds between the starts of two runs of an outlet) ======
+DEFAULT_INTERVAL = int(os.getenv("CRAWL_INTERVAL", "1800"))
+INTERVALS = {
+    "BBC":          900,
+    "The Guardian": 900,
+    "Sky News":     1200,
+    "CNN":          1200,
+}
+
+# ====== Stats Endpoint ======
+STATS_HOST = os.getenv("CRAWL_STATS_HOST", "127.0.0.1")
+STATS_PORT = int(os.getenv("CRAWL_STATS_PORT", "8765"))
+HISTORY    = 20   # runs kept per outlet
+
+
+class OutletSchedule:
+    """Run loop and metrics for one outlet.
+
+    An outlet has exactly one loop, so a run that takes longer than the
+    interval delays the next one instead of overlapping with it.
+    """
+
+    def __init__(self, adapter, interval):
+        self.adapter = adapter
+        self.interval = interval
+        self.running = False
+        self.next_run = None
+        self.runs = []
+        self.totals = {"runs": 0, "failed_runs": 0, "overruns": 0,
+                       "pages_fetched": 0, "new_articles": 0}
+
+    async def run_once(self, engine):
+        self.running = True
+        started, started_at = time.monotonic(), datetime.now()
+        try:
+            stats = await engine.crawl_site(self.adapter)
+        except Exception as e:
+            print(f"❌ {self.adapter.name} run failed: {e}")
+            self.totals["failed_runs"] += 1
+            stats = {"error": str(e)}
+        finally:
+            self.running = False
+            engine.save_state()
+
+        duration = time.monotonic() - started
+        run = {
+            "started_at": started_at.isoformat(),
+            "duration": round(duration, 2),
+            "pages_fetched": stats.get("pages_fetched", 0),
+            "new_articles": stats.get("saved", 0),
+            "requests": stats.get("requests", 0),
+            "discovery": stats.get("discovery"),
+            "discovered": stats.get("discovered", 0),
+            "skipped_known": stats.get("skipped_known", 0),
+            "near_duplicates": stats.get("near_duplicates", 0),
+        }
+        if "error" in stats:
+            run["error"] = stats["error"]
+        self.runs = (self.runs + [run])[-HISTORY:]
+        self.totals["runs"] += 1
+        self.totals["pages_fetched"] += run["pages_fetched"]
+        self.totals["new_articles"] += run["new_articles"]
+        print(f"⏱️ {self.adapter.name}: {run['new_articles']} new articles, "
+              f"{run['pages_fetched']} pages in {duration:.1f}s")
+        return duration
+
+    async def loop(self, engine):
+        while True:
+            duration = await self.run_once(engine)
+            if duration >= self.interval:
+                self.totals["overruns"] += 1
+                print(f"⚠️ {self.adapter.name} run took {duration:.1f}s, "
+                      f"longer than its {self.interval}s interval")
+            wait = max(0.0, self.interval - duration)
+            self.next_run = datetime.fromtimestamp(time.time() + wait).isoformat()
+            await asyncio.sleep(wait)
+
+    def snapshot(self):
+        return {
+            "interval": self.interval,
+            "running": self.running,
+            "next_run": None if self.running else self.next_run,
+            "last_run": self.runs[-1] if self.runs else None,
+            "totals": self.totals,
+            "history": self.runs,
+        }
+
+
+class CrawlDaemon:
+    """Keeps one CrawlEngine (HTTP pool, Mongo client, crawl state) alive
+    and runs every outlet on its own schedule."""
+
+    def __init__(self, adapters, intervals=None, host=STATS_HOST, port=STATS_PORT,
+                 **engine_kwargs):
+        intervals = intervals or INTERVALS
+        self.schedules = [
+            OutletSchedule(a, intervals.get(a.name, DEFAULT_INTERVAL)) for a in adapters
+        ]
+        self.host = host
+        self.port = port
+        self.engine_kwargs = engine_kwargs
+        self.started_at = None
+        self.engine = None
+
+    def stats(self):
+        return {
+            "started_at": self.started_at.isoformat(),
+            "uptime": round((datetime.now() - self.started_at).total_seconds()),
+            "outlets": {s.adapter.name: s.snapshot() for s in self.schedules},
+            "hosts": self.engine.scheduler.snapshot(),
+            "sink": getattr(self.engine.sink, "totals", None),
+            "known_urls": len(self.engine.known),
+            "dead_letters": len(self.engine.dead_letters.entries),
+        }
+
+    async def handle_stats(self, request):
+        return web.json_response(self.stats())
+
+    async def serve(self, stop):
+        app = web.Application()
+        app.router.add_get("/stats", self.handle_stats)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        print(f"📈 Stats on http://{self.host}:{self.port}/stats")
+        try:
+            await stop.wait()
+        finally:
+            await runner.cleanup()
+
+    async def run(self):
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        self.started_at = datetime.now()
+        async with CrawlEngine(**self.engine_kwargs) as engine:
+            self.engine = engine
+            loops = [asyncio.create_task(s.loop(engine)) for s in self.schedules]
+            try:
+                await self.serve(stop)
+            finally:
+                print("🛑 Stopping crawl daemon...")
+                for task in loops:
+                    task.cancel()
+                await asyncio.gather(*loops, return_exceptions=True)
+
+
+def run_daemon():
+    asyncio.run(CrawlDaemon(ADAPTERS).run())
+
+if __name__ == "__main__":
+    run_daemon()
@@ -0,0 +1,444 @@
+import os
+import time
+import asyncio
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from article_sink import ArticleSink
+from crawl_scheduler import (
+    Scheduler, DeadLetters, MAX_ATTEMPTS, RETRY_STATUSES, backoff_delay, parse_retry_after
+)
+from feed_discovery import FeedMarks, parse_feed
+from fixture_store import FixtureStore
+from http_cache import ValidatorCache
+from known_urls import KnownUrls
+from near_duplicates import SimHashIndex, simhash, to_hex
+from transports import (
+    HttpTransport, ReplayTransport, RecordingTransport, HTTPError, TRANSIENT_ERRORS
+)
+from url_normalizer import normalize_url
+
+load_dotenv()
+
+# ====== MongoDB Connection ======
+MONGO_URI  = os.getenv("MONGO_URI")
+client     = MongoClient(MONGO_URI)
+db         = client["news_db"]
+collection = db["articles"]
+
+# ====== Crawl Limits ======
+PER_HOST_LIMIT  = int(os.getenv("CRAWL_PER_HOST_LIMIT", "8"))
+TOTAL_LIMIT     = int(os.getenv("CRAWL_TOTAL_LIMIT", "64"))
+REQUEST_TIMEOUT = 10
+
+# ====== Local Crawl State ======
+STATE_DIR = os.getenv(
+    "CRAWL_STATE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".crawl_state")
+)
+
+# ====== Discovery Mode ======
+# "feeds" reads each outlet's RSS/Atom feeds and news sitemaps, falling back
+# to section pages when an outlet has none or all of them fail;
+# "sections" always scrapes the section pages.
+DISCOVERY         = os.getenv("CRAWL_DISCOVERY", "feeds")
+MAX_SITEMAP_DEPTH = 1   # sitemap index -> sitemaps
+
+# ====== Offline Fixtures ======
+# CRAWL_REPLAY serves every request from a recorded fixture store,
+# CRAWL_RECORD saves every live response into one.
+REPLAY_DIR = os.getenv("CRAWL_REPLAY")
+RECORD_DIR = os.getenv("CRAWL_RECORD")
+
+# Stats dict of the crawl_site run the current task belongs to
+current_run = ContextVar("current_run", default=None)
+
+
+class SiteAdapter:
+    """Everything the engine needs to know about one outlet.
+
+    parse_section(html, url) returns a list of {"url": ...} dicts,
+    parse_article(html, url) returns the article document or None when
+    the page has no usable title/content. feeds lists RSS/Atom feeds and
+    news sitemaps used for discovery in feed mode.
+    """
+
+    def __init__(self, name, urls, headers, parse_section, parse_article, feeds=()):
+        self.name = name
+        self.urls = urls
+        self.headers = headers
+        self.parse_section = parse_section
+        self.parse_article = parse_article
+        self.feeds = feeds
+
+
+def ensure_indexes():
+    """Unique url_key index; partial so legacy articles without a key don't clash."""
+    collection.create_index(
+        "url_key",
+        unique=True,
+        partialFilterExpression={"url_key": {"$exists": True}}
+    )
+
+
+def parse_and_sign(adapter, html, url):
+    """Run the outlet's article parser and fingerprint the content it found."""
+    doc = adapter.parse_article(html, url)
+    if doc:
+        sig = simhash(doc.get("content") or "")
+        if sig is not None:
+            doc["simhash"] = to_hex(sig)
+    return doc
+
+
+def default_transport(total_limit, per_host_limit, timeout):
+    """Live HTTP, unless CRAWL_REPLAY / CRAWL_RECORD point at a fixture store."""
+    if REPLAY_DIR:
+        print(f"📼 Replaying responses from {REPLAY_DIR}")
+        return ReplayTransport(FixtureStore(REPLAY_DIR))
+    transport = HttpTransport(total_limit, per_host_limit, timeout)
+    if RECORD_DIR:
+        print(f"⏺️ Recording responses into {RECORD_DIR}")
+        transport = RecordingTransport(transport, FixtureStore(RECORD_DIR))
+    return transport
+
+
+class CrawlEngine:
+    """Two-phase crawler shared by all outlets.
+
+    One transport (for live crawls, one pooled aiohttp session) serves
+    every site. Requests to each host go through the shared Scheduler,
+    which rate-limits, adapts concurrency (up to per_host_limit) and
+    retries transient failures. Passing collection=None runs without
+    Mongo; a sink must then be supplied.
+    """
+
+    def __init__(self, per_host_limit=PER_HOST_LIMIT, total_limit=TOTAL_LIMIT,
+                 timeout=REQUEST_TIMEOUT, transport=None, sink=None, scheduler=None,
+                 collection=collection, state_dir=STATE_DIR):
+        self.scheduler = scheduler or Scheduler(per_host_limit)
+        self.collection = collection
+        self.transport = transport or default_transport(total_limit, per_host_limit, timeout)
+        self.sink = sink or ArticleSink(collection)
+        self.validators = ValidatorCache(os.path.join(state_dir, "http_cache.json"))
+        self.known = KnownUrls(os.path.join(state_dir, "known_urls.json"))
+        self.dead_letters = DeadLetters(os.path.join(state_dir, "dead_letters.jsonl"))
+        self.feed_marks = FeedMarks(os.path.join(state_dir, "feed_marks.json"))
+        self.near_dups = SimHashIndex()
+
+    async def start(self):
+        await self.transport.start()
+        await self.sink.start()
+        if self.collection is None:
+            return
+        try:
+            await asyncio.to_thread(ensure_indexes)
+        except Exception as e:
+            print(f"⚠️ Could not ensure url_key index: {e}")
+        try:
+            await asyncio.to_thread(self.known.warm, self.collection)
+        except Exception as e:
+            print(f"⚠️ Could not warm known URLs from Mongo, using snapshot only: {e}")
+        try:
+            await asyncio.to_thread(self.near_dups.warm, self.collection)
+        except Exception as e:
+            print(f"⚠️ Could not warm the SimHash index from Mongo: {e}")
+
+    async def close(self):
+        await self.sink.close()
+        await self.transport.close()
+        self.save_state()
+
+    def save_state(self):
+        """Persist validators, known URLs, dead letters and feed marks."""
+        self.validators.save()
+        self.known.save()
+        self.dead_letters.save()
+        self.feed_marks.save()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, url, headers, kind):
+        """GET through the host's scheduler, retrying 429/5xx and network errors.
+
+        Non-retryable responses (2xx, 304, other 4xx) are returned as-is;
+        a 4xx also clears the URL's dead letter. A URL that fails every
+        attempt is dead-lettered and its last error re-raised.
+        """
+        host = self.scheduler.for_url(url)
+        run = current_run.get()
+        for attempt in range(MAX_ATTEMPTS):
+            retry_after = None
+            await host.acquire()
+            started = time.monotonic()
+            if run is not None:
+                run["requests"] += 1
+            try:
+                r = await self.transport.get(url, headers, kind)
+            except TRANSIENT_ERRORS as e:
+                await host.release(time.monotonic() - started, failed=True)
+                error = e
+            except BaseException:
+                # Cancelled or an unexpected error: free the slot, then propagate
+                await host.abandon()
+                raise
+            else:
+                failed = r.status in RETRY_STATUSES
+                await host.release(time.monotonic() - started, failed=failed,
+                                   throttled=r.status == 429)
+                if not failed:
+                    if run is not None and r.status < 300:
+                        run["pages_fetched"] += 1
+                    if r.status >= 400:
+                        # 404, 410, ...: retrying in a later crawl won't help either
+                        self.dead_letters.resolve(url)
+                    return r
+                error = HTTPError(r.status, url)
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+
+            if attempt + 1 < MAX_ATTEMPTS:
+                delay = backoff_delay(attempt, retry_after)
+                print(f"🔁 Retry {attempt + 1}/{MAX_ATTEMPTS - 1} for {url} in {delay:.1f}s ({error})")
+                await asyncio.sleep(delay)
+
+        self.dead_letters.add(url, kind, error, MAX_ATTEMPTS, run["outlet"] if run is not None else None)
+        raise error
+
+    async def fetch(self, url, headers):
+        r = await self.request(url, headers, "article")
+        r.raise_for_status()
+        return r.text()
+
+    async def fetch_if_changed(self, url, headers, kind="section"):
+        """Conditional GET for index pages and feeds.
+
+        Returns (html, body, response headers), or None when the server
+        answers 304 or sends back the exact body we parsed last time.
+        """
+        request_headers = {**headers, **self.validators.conditional_headers(url)}
+        r = await self.request(url, request_headers, kind)
+        if r.status == 304:
+            return None
+        r.raise_for_status()
+
+        if self.validators.is_unchanged(url, r.body):
+            # Same bytes, possibly new validators: remember them for next time
+            self.validators.update(url, r.headers, r.body)
+            return None
+        return r.text(), r.body, r.headers
+
+    async def scrape_section(self, adapter, url):
+        """Phase 1: gather all article URLs from a section.
+
+        Returns None when the section has not changed since the last crawl.
+        """
+        try:
+            print(f"🔍 Scraping section: {url}")
+            page = await self.fetch_if_changed(url, adapter.headers)
+            if page is None:
+                print(f"♻️ Unchanged since last crawl: {url}")
+                return None
+
+            html, body, response_headers = page
+            out = await asyncio.to_thread(adapter.parse_section, html, url)
+            # Only remember validators once the page was parsed successfully
+            self.validators.update(url, response_headers, body)
+            self.dead_letters.resolve(url)
+            print(f"✅ Found {len(out)} articles in {url}")
+            return out
+
+        except Exception as e:
+            print(f"❌ Error scraping section {url}: {e}")
+            return []
+
+    async def discover_feed(self, adapter, feed_url, depth=0):
+        """Phase 1 (feed mode): article URLs newer than the feed's high-water mark.
+
+        Sitemap indexes are followed one level down. Returns None when the
+        feed has not changed since the last crawl; errors propagate so the
+        caller can fall back to section pages.
+        """
+        print(f"📰 Reading feed: {feed_url}")
+        page = await self.fetch_if_changed(feed_url, adapter.headers, "feed")
+        if page is None:
+            print(f"♻️ Unchanged since last crawl: {feed_url}")
+            return None
+
+        _, body, response_headers = page
+        gzipped = body[:2] == b"\x1f\x8b"   # .xml.gz sitemaps
+        articles, sitemaps, newest = await asyncio.to_thread(
+            parse_feed, body, self.feed_marks.get(feed_url), gzipped
+        )
+
+        if sitemaps and depth < MAX_SITEMAP_DEPTH:
+            nested = await asyncio.gather(
+                *(self.discover_feed(adapter, s["url"], depth + 1) for s in sitemaps)
+            )
+            articles += [item for sub in nested if sub for item in sub]
+
+        # Advance the mark only once everything under it was read
+        self.validators.update(feed_url, response_headers, body)
+        self.feed_marks.update(feed_url, newest)
+        self.dead_letters.resolve(feed_url)
+        print(f"✅ Found {len(articles)} new entries in {feed_url}")
+        return articles
+
+    async def discover_feeds(self, adapter):
+        """Run discover_feed for every feed; None when all of them failed."""
+        results = await asyncio.gather(
+            *(self.discover_feed(adapter, url) for url in adapter.feeds),
+            return_exceptions=True
+        )
+        out = []
+        for url, result in zip(adapter.feeds, results):
+            if isinstance(result, Exception):
+                print(f"❌ Error reading feed {url}: {result}")
+            else:
+                out.append(result)
+        return out if out else None
+
+    def link_near_duplicate(self, doc):
+        """Turn doc into a stub pointing at a recent near-identical article.
+
+        The stub keeps title, URL, date and images but no content, so the
+        NER, relation and summarization passes only see the story once.
+        Returns the canonical url_key, or None when doc is canonical itself;
+        a canonical doc is only indexed (index_canonical) once it is stored.
+        """
+        if "simhash" not in doc:
+            return None
+        canonical = self.near_dups.match(int(doc["simhash"], 16))
+        if canonical is None or canonical == doc["url_key"]:
+            return None
+        doc["duplicate_of"] = canonical
+        doc.pop("content", None)
+        return canonical
+
+    def index_canonical(self, doc):
+        """Make a stored canonical article a match target for later copies."""
+        if "simhash" in doc:
+            self.near_dups.add(int(doc["simhash"], 16), doc["url_key"])
+
+    async def get_full_article(self, adapter, article):
+        """Phase 2: fetch an article page & hand it to the bulk sink."""
+        url = article["url"]
+
+        try:
+            html = await self.fetch(url, adapter.headers)
+            self.dead_letters.resolve(url)
+            doc = await asyncio.to_thread(parse_and_sign, adapter, html, url)
+
+            if not doc:
+                print(f"⚠️ Skipping (no title/content): {url}")
+                return False
+
+            doc["url_key"] = normalize_url(url)
+            canonical = self.link_near_duplicate(doc)
+            inserted = await self.sink.put(doc)
+            if inserted is None:
+                # Feed marks and section validators won't offer the URL again
+                run = current_run.get()
+                self.dead_letters.add(url, "article", "article write failed", 1,
+                                      run["outlet"] if run is not None else None)
+            else:
+                self.known.add(url)
+            if inserted and canonical:
+                print(f"🔗 Near-duplicate of {canonical}: {url}")
+                run = current_run.get()
+                if run is not None:
+                    run["near_duplicates"] += 1
+                return False
+            if inserted:
+                self.index_canonical(doc)
+                print(f"✅ Saved: {doc['title'][:60]}...")
+                return True
+            return False
+
+        except Exception as e:
+            print(f"❌ Error processing article {url}: {e}")
+            return False
+
+    async def crawl_site(self, adapter):
+        """Orchestrate the two-phase scrape & ingest for one outlet."""
+        stats = {"outlet": adapter.name, "discovery": "feeds", "sections": len(adapter.urls),
+                 "unchanged_sections": 0, "discovered": 0, "unique": 0,
+                 "skipped_known": 0, "dead_letter_retries": 0, "saved": 0,
+                 "near_duplicates": 0, "requests": 0, "pages_fetched": 0}
+        # Lets request() count this outlet's traffic, even with other outlets in flight
+        current_run.set(stats)
+
+        # Phase 1: gather URLs from the outlet's feeds, or every section concurrently
+        all_lists = None
+        if DISCOVERY == "feeds" and adapter.feeds:
+            all_lists = await self.discover_feeds(adapter)
+            if all_lists is None:
+                print(f"⚠️ Every {adapter.name} feed failed, falling back to section pages")
+        if all_lists is None:
+            stats["discovery"] = "sections"
+            all_lists = await asyncio.gather(
+                *(self.scrape_section(adapter, url) for url in adapter.urls)
+            )
+        stats["unchanged_sections"] = sum(1 for sub in all_lists if sub is None)
+        all_articles = [item for sub in all_lists if sub for item in sub]
+        stats["discovered"] = len(all_articles)
+
+        # Articles that exhausted their retries on earlier runs get another go
+        hosts = {urlsplit(url).netloc.lower() for url in adapter.urls}
+        retries = self.dead_letters.retryable_articles(adapter.name, hosts)
+        stats["dead_letter_retries"] = len(retries)
+        all_articles += retries
+
+        if not all_articles:
+            if stats["discovery"] == "feeds":
+                print(f"♻️ No new {adapter.name} feed entries since the last crawl")
+            elif stats["unchanged_sections"]:
+                print(f"♻️ No {adapter.name} sections changed since the last crawl")
+            else:
+                print(f"⚠️ No articles found for {adapter.name}!")
+            return stats
+
+        # Deduplicate URLs
+        seen = set()
+        unique = []
+        for art in all_articles:
+            clean = normalize_url(art["url"])
+            if clean not in seen:
+                seen.add(clean)
+                unique.append(art)
+        stats["unique"] = len(unique)
+
+        # Drop articles we already have before spending a request on them
+        fresh = [art for art in unique if art["url"] not in self.known]
+        stats["skipped_known"] = len(unique) - len(fresh)
+
+        print(f"🔎 Total unique {adapter.name} articles: {len(unique)}, "
+              f"already ingested: {stats['skipped_known']}, to process: {len(fresh)}")
+
+        # Phase 2: fetch & insert; only the host limits bound concurrency
+        results = await asyncio.gather(
+            *(self.get_full_article(adapter, art) for art in fresh)
+        )
+
+        stats["saved"] = sum(1 for r in results if r)
+        print(f"✅ {adapter.name} finished. Articles saved: {stats['saved']} / {len(fresh)}")
+        print(f"🎉 {adapter.name} scraping complete.")
+        return stats
+
+    async def crawl(self, adapters):
+        """Crawl several outlets at once on the same event loop."""
+        return await asyncio.gather(*(self.crawl_site(a) for a in adapters))
+
+
+def run_crawl(adapters, **engine_kwargs):
+    """Blocking entry point used by the per-outlet scripts and crawl_all.py."""
+    async def main():
+        async with CrawlEngine(**engine_kwargs) as engine:
+            return await engine.crawl(adapters)
+
+    return asyncio.run(main())
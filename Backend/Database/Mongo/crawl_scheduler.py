@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import random
+import asyncio
+from datetime import datetime
+from urllib.parse import urlsplit
+
+# ====== Per-host Defaults ======
+HOST_RATE        = float(os.getenv("CRAWL_HOST_RATE", "10"))   # requests / second
+HOST_BURST       = int(os.getenv("CRAWL_HOST_BURST", "10"))
+MIN_RATE         = 0.5
+INITIAL_WINDOW   = 2.0
+TARGET_LATENCY   = 2.0   # seconds; slower responses shrink the window
+
+# ====== Retry Policy ======
+MAX_ATTEMPTS     = 4
+BACKOFF_BASE     = 1.0   # seconds
+BACKOFF_CAP      = 30.0
+RETRY_STATUSES   = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Jittered exponential delay before retry number attempt+1.
+
+    A server-supplied Retry-After always wins when it is longer.
+    """
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def parse_retry_after(value):
+    try:
+        return min(BACKOFF_CAP * 4, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class HostScheduler:
+    """Token bucket plus an AIMD concurrency window for one host.
+
+    The window starts small and doubles per window of fast, successful
+    responses until the first sign of trouble (slow start); after that it
+    grows by about one slot per window and halves on throttling or server
+    errors. 429s also halve the request rate; rate=None disables the
+    token bucket (used when replaying fixtures).
+    """
+
+    def __init__(self, host, max_window, rate=HOST_RATE, burst=HOST_BURST):
+        self.host = host
+        self.max_window = max_window
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.window = min(INITIAL_WINDOW, max_window)
+        self.slow_start = True
+        self.in_flight = 0
+        self.cond = asyncio.Condition()
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "latency_total": 0.0}
+
+    def _take_token(self):
+        """Take a token if one is available; otherwise return seconds to wait."""
+        if self.rate is None:
+            return 0
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.in_flight < int(self.window))
+            self.in_flight += 1
+        try:
+            while True:
+                wait = self._take_token()
+                if not wait:
+                    return
+                await asyncio.sleep(wait)
+        except BaseException:
+            await self.abandon()
+            raise
+
+    async def abandon(self):
+        """Give back a slot without a response (cancelled or crashed request).
+
+        Nothing was learned about the host, so the window is left alone.
+        """
+        async with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    async def release(self, latency, failed=False, throttled=False):
+        async with self.cond:
+            self.in_flight -= 1
+            self.stats["requests"] += 1
+            self.stats["latency_total"] += latency
+
+            if throttled or failed or latency > TARGET_LATENCY:
+                self.slow_start = False
+
+            if throttled:
+                self.stats["throttled"] += 1
+                if self.rate is not None:
+                    self.rate = max(MIN_RATE, self.rate / 2)
+                self.window = max(1.0, self.window / 2)
+            elif failed:
+                self.stats["errors"] += 1
+                self.window = max(1.0, self.window / 2)
+            elif latency > TARGET_LATENCY:
+                self.window = max(1.0, self.window * 0.9)
+            else:
+                step = 1 if self.slow_start else 1 / self.window
+                self.window = min(self.max_window, self.window + step)
+                if self.rate is not None:
+                    self.rate = min(self.max_rate, self.rate + 0.1)
+
+            self.cond.notify_all()
+
+    def snapshot(self):
+        requests = self.stats["requests"]
+        return {
+            "window": round(self.window, 2),
+            "rate": round(self.rate, 2) if self.rate is not None else None,
+            "requests": requests,
+            "errors": self.stats["errors"],
+            "throttled": self.stats["throttled"],
+            "avg_latency": round(self.stats["latency_total"] / requests, 3) if requests else None,
+        }
+
+
+class Scheduler:
+    """One HostScheduler per host, shared by every outlet in the process."""
+
+    def __init__(self, max_window, rate=HOST_RATE, burst=HOST_BURST):
+        self.max_window = max_window
+        self.rate = rate
+        self.burst = burst
+        self.hosts = {}
+
+    def for_url(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self.hosts:
+            self.hosts[host] = HostScheduler(host, self.max_window, self.rate, self.burst)
+        return self.hosts[host]
+
+    def snapshot(self):
+        return {host: h.snapshot() for host, h in self.hosts.items()}
+
+
+class DeadLetters:
+    """URLs that still failed after every retry, kept as JSON lines on disk.
+
+    Article entries are handed back to the next crawl of their host.
+    Entries are dropped after MAX_RUNS unsuccessful crawls, or as soon as
+    the server gives a definitive answer (success or a non-retryable error).
+    """
+
+    MAX_RUNS = 3
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            skipped = 0
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                            entry["kind"], entry["runs"]   # fields the retry logic relies on
+                            self.entries[entry["url"]] = entry
+                        except (ValueError, KeyError, TypeError):
+                            skipped += 1
+            except OSError as e:
+                print(f"⚠️ Ignoring unreadable dead letters {path}: {e}")
+            if skipped:
+                print(f"⚠️ Skipped {skipped} unreadable dead-letter lines in {path}")
+                self.dirty = True
+
+    def add(self, url, kind, error, attempts, outlet=None):
+        previous = self.entries.get(url, {})
+        self.entries[url] = {
+            "url": url,
+            "kind": kind,
+            "outlet": outlet or previous.get("outlet"),
+            "error": str(error) or type(error).__name__,
+            "attempts": attempts,
+            "runs": previous.get("runs", 0) + 1,
+            "failed_at": datetime.now().isoformat(),
+        }
+        self.dirty = True
+        print(f"☠️ Dead-lettered after {attempts} attempts: {url} ({self.entries[url]['error']})")
+
+    def retryable_articles(self, outlet, hosts=()):
+        """Article URLs of an outlet that deserve another attempt.
+
+        Entries are matched on the outlet that dead-lettered them, so
+        articles found on feed-only hosts are retried too; entries written
+        before outlets were recorded fall back to the given hosts.
+        """
+        return [
+            {"url": url} for url, entry in self.entries.items()
+            if entry["kind"] == "article"
+            and (entry["outlet"] == outlet if entry.get("outlet") else urlsplit(url).netloc.lower() in hosts)
+            and entry["runs"] < self.MAX_RUNS
+        ]
+
+    def resolve(self, url):
+        if self.entries.pop(url, None):
+            self.dirty = True
+
+    def save(self):
+        expired = [url for url, entry in self.entries.items() if entry["runs"] >= self.MAX_RUNS]
+        for url in expired:
+            del self.entries[url]
+        if not (self.dirty or expired):
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -0,0 +1,152 @@
+import os
+import json
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import XMLPullParser
+from dateutil import parser as date_parser
+
+CHUNK_SIZE = 64 * 1024
+
+# Elements that describe one discoverable URL, by local tag name
+ENTRY_TAGS = {
+    "item",      # RSS 2.0
+    "entry",     # Atom
+    "url",       # sitemap / news sitemap
+    "sitemap",   # sitemap index (points at further sitemaps)
+}
+DATE_TAGS = ("lastmod", "publication_date", "updated", "published", "pubDate", "date")
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_date(value):
+    """Feed timestamp (RFC 822 or ISO 8601) as an aware UTC datetime, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            dt = date_parser.parse(value)
+        except (ValueError, OverflowError):
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _entry(el):
+    """(url, lastmod) for one item/entry/url/sitemap element."""
+    url, dates = None, {}
+    for child in el:
+        name = local_name(child.tag)
+        if name == "loc" or (name == "link" and child.text and child.text.strip()):
+            url = url or child.text.strip()
+        elif name == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+            # Atom: <link rel="alternate" href="..."/>
+            url = url or child.get("href")
+        elif name == "guid" and child.get("isPermaLink") == "true" and child.text:
+            url = url or child.text.strip()
+        elif name in DATE_TAGS:
+            dates[name] = child.text
+        elif name == "news":
+            # <news:news><news:publication_date>...</news:publication_date></news:news>
+            for sub in child:
+                if local_name(sub.tag) == "publication_date":
+                    dates["publication_date"] = sub.text
+
+    lastmod = None
+    for name in DATE_TAGS:
+        lastmod = parse_date(dates.get(name))
+        if lastmod:
+            break
+    return url, lastmod
+
+
+def iter_chunks(body, gzipped=False):
+    """Split a response body into parser-sized chunks, inflating .gz sitemaps."""
+    inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    for i in range(0, len(body), CHUNK_SIZE):
+        chunk = body[i:i + CHUNK_SIZE]
+        yield inflate.decompress(chunk) if inflate else chunk
+    if inflate:
+        yield inflate.flush()
+
+
+def parse_feed(body, since=None, gzipped=False):
+    """Stream-parse an RSS, Atom, sitemap or sitemap-index document.
+
+    Each entry element is cleared as soon as it is read, so memory stays flat
+    however large the sitemap. Returns (articles, sitemaps, newest):
+    article URLs and nested sitemap URLs whose lastmod is newer than since
+    (entries without a lastmod are always kept), plus the newest lastmod
+    seen, which becomes the feed's next high-water mark.
+    """
+    pull = XMLPullParser(events=("end",))
+    articles, sitemaps, newest = [], [], since
+
+    def drain():
+        nonlocal newest
+        for _, el in pull.read_events():
+            name = local_name(el.tag)
+            if name not in ENTRY_TAGS:
+                continue
+            url, lastmod = _entry(el)
+            el.clear()
+            if not url:
+                continue
+            if since and lastmod and lastmod <= since:
+                continue
+            if lastmod and (newest is None or lastmod > newest):
+                newest = lastmod
+            (sitemaps if name == "sitemap" else articles).append({"url": url})
+
+    for chunk in iter_chunks(body, gzipped):
+        pull.feed(chunk)
+        drain()
+    pull.close()
+    drain()
+    return articles, sitemaps, newest
+
+
+class FeedMarks:
+    """Per-feed high-water marks: the newest lastmod already handed out.
+
+    Stored next to the other crawl state so each run only emits entries
+    published or modified since the previous one.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.marks = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.marks = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable feed marks {path}: {e}")
+                self.marks = {}
+
+    def get(self, feed_url):
+        value = self.marks.get(feed_url)
+        return datetime.fromisoformat(value) if value else None
+
+    def update(self, feed_url, newest):
+        if newest and newest != self.get(feed_url):
+            self.marks[feed_url] = newest.isoformat()
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.marks, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -11,7 +11,11 @@ db = client["news_db"]
 collection = db["articles"]
 
 def analyze_duplicates():
-    """Run comprehensive duplicate analysis"""
+    """Run comprehensive duplicate analysis
+
+    Duplicates can only come from articles stored before url_key existed;
+    new inserts are kept unique by the url_key index.
+    """
     print("\n🔍 Starting duplicate analysis...")
     
     # 1. Basic duplicate count by URL
@@ -0,0 +1,64 @@
+import os
+import gzip
+import json
+import hashlib
+
+
+class FixtureStore:
+    """Recorded HTTP responses on local disk.
+
+    <root>/index.json maps each URL to its status, a few response headers,
+    the page kind ("section" or "article") and a gzipped body file.
+    """
+
+    KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.index = {}
+        self.dirty = False
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def urls(self, kind=None):
+        return [url for url, entry in self.index.items() if kind is None or entry["kind"] == kind]
+
+    def save(self, url, status, headers, body, kind):
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html.gz"
+        os.makedirs(os.path.join(self.root, "bodies"), exist_ok=True)
+        with gzip.open(os.path.join(self.root, "bodies", name), "wb") as f:
+            f.write(body)
+        self.index[url] = {
+            "file": name,
+            "status": status,
+            "kind": kind,
+            "headers": {h: headers[h] for h in self.KEPT_HEADERS if h in headers},
+        }
+        self.dirty = True
+
+    def load(self, url):
+        """(status, headers, body) for a recorded URL, or None."""
+        entry = self.index.get(url)
+        if not entry:
+            return None
+        with gzip.open(os.path.join(self.root, "bodies", entry["file"]), "rb") as f:
+            body = f.read()
+        return entry["status"], entry["headers"], body
+
+    def flush(self):
+        if not self.dirty:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, self.index_path)
+        self.dirty = False
@@ -0,0 +1,157 @@
+import os
+import soupsieve
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
+
+# ====== Parser Backend ======
+# "lxml" (C parser + selectors compiled to XPath) or "bs4" (BeautifulSoup with html.parser)
+BACKEND = os.getenv("SCRAPER_PARSER", "lxml" if HAVE_LXML else "bs4")
+
+# Strings inside these tags are not page text (matches BeautifulSoup.get_text)
+NON_TEXT_TAGS = {"script", "style", "template"}
+
+
+class Selector:
+    """A CSS selector compiled once, at import time, for both backends."""
+
+    def __init__(self, css):
+        self.css = css
+        self.sieve = soupsieve.compile(css)
+        self.xpath = CSSSelector(css, translator="html") if HAVE_LXML else None
+
+    def __repr__(self):
+        return f"css({self.css!r})"
+
+
+def css(selector):
+    return Selector(selector)
+
+
+class LxmlPage:
+    """Page parsed with lxml.html; elements are lxml elements."""
+
+    def __init__(self, html):
+        try:
+            self.root = lxml.html.document_fromstring(html)
+        except etree.ParserError:
+            # Empty document
+            self.root = lxml.html.Element("html")
+        except ValueError:
+            # Unicode string carrying an XML encoding declaration
+            self.root = lxml.html.document_fromstring(html.encode("utf-8"))
+
+    def select(self, selector, root=None):
+        return selector.xpath(self.root if root is None else root)
+
+    def select_one(self, selector, root=None):
+        found = self.select(selector, root)
+        return found[0] if found else None
+
+    def attr(self, el, name, default=None):
+        return el.get(name, default)
+
+    def strings(self, el):
+        if isinstance(el.tag, str) and el.tag not in NON_TEXT_TAGS and el.text:
+            yield el.text
+        for child in el:
+            yield from self.strings(child)
+            if child.tail:
+                yield child.tail
+
+    def text(self, el):
+        """Equivalent of BeautifulSoup's get_text(strip=True)."""
+        return "".join(s.strip() for s in self.strings(el))
+
+    def raw_text(self, el):
+        return "".join(self.strings(el))
+
+    def find_text(self, pattern, root=None):
+        """First text node under root matching the compiled regex."""
+        for s in self.strings(self.root if root is None else root):
+            if pattern.search(s):
+                return s
+        return None
+
+    def remove(self, el):
+        el.drop_tree()
+
+    def richest(self, tag, child_tag, root=None):
+        """The tag element holding the most child_tag descendants.
+
+        Ties go to the first element in document order. Counting walks each
+        child's ancestors once, so this is linear in the page size.
+        """
+        root = self.root if root is None else root
+        counts = {}
+        for child in root.iter(child_tag):
+            for ancestor in child.iterancestors(tag):
+                counts[ancestor] = counts.get(ancestor, 0) + 1
+
+        best, best_count = None, -1
+        for el in root.iter(tag):
+            if counts.get(el, 0) > best_count:
+                best, best_count = el, counts.get(el, 0)
+        return best
+
+
+class SoupPage:
+    """Page parsed with BeautifulSoup's html.parser; elements are bs4 Tags."""
+
+    def __init__(self, html):
+        self.root = BeautifulSoup(html, "html.parser")
+
+    def select(self, selector, root=None):
+        return selector.sieve.select(self.root if root is None else root)
+
+    def select_one(self, selector, root=None):
+        return selector.sieve.select_one(self.root if root is None else root)
+
+    def attr(self, el, name, default=None):
+        return el.get(name, default)
+
+    def text(self, el):
+        return el.get_text(strip=True)
+
+    def raw_text(self, el):
+        return el.get_text()
+
+    def find_text(self, pattern, root=None):
+        return (self.root if root is None else root).find(string=pattern)
+
+    def remove(self, el):
+        el.decompose()
+
+    def richest(self, tag, child_tag, root=None):
+        root = self.root if root is None else root
+        counts = {}
+        for child in root.find_all(child_tag):
+            for ancestor in child.parents:
+                if ancestor.name == tag:
+                    counts[id(ancestor)] = counts.get(id(ancestor), 0) + 1
+
+        best, best_count = None, -1
+        for el in root.find_all(tag):
+            if counts.get(id(el), 0) > best_count:
+                best, best_count = el, counts.get(id(el), 0)
+        return best
+
+
+BACKENDS = {"bs4": SoupPage}
+if HAVE_LXML:
+    BACKENDS["lxml"] = LxmlPage
+
+if BACKEND not in BACKENDS:
+    print(f"⚠️ Parser backend {BACKEND!r} unavailable, falling back to bs4")
+    BACKEND = "bs4"
+
+
+def parse(html, backend=None):
+    """Parse a page with the configured backend (or an explicit one)."""
+    return BACKENDS[backend or BACKEND](html)
@@ -0,0 +1,62 @@
+import os
+import json
+import hashlib
+
+
+class ValidatorCache:
+    """Per-URL HTTP validators (ETag, Last-Modified) plus a hash of the body.
+
+    Persisted as a small JSON file so the hourly crawl can send conditional
+    requests for section pages and skip the ones that have not changed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable HTTP cache {path}: {e}")
+                self.entries = {}
+
+    @staticmethod
+    def digest(body):
+        return hashlib.sha1(body).hexdigest()
+
+    def conditional_headers(self, url):
+        """Request headers that let the server answer 304 Not Modified."""
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+        out = {}
+        if entry.get("etag"):
+            out["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            out["If-Modified-Since"] = entry["last_modified"]
+        return out
+
+    def is_unchanged(self, url, body):
+        """True when a 200 response carries exactly the body we saw last time."""
+        entry = self.entries.get(url)
+        return bool(entry) and entry.get("hash") == self.digest(body)
+
+    def update(self, url, response_headers, body):
+        self.entries[url] = {
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "hash": self.digest(body),
+        }
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -0,0 +1,92 @@
+import re
+from urllib.parse import urlsplit
+
+# Width hints carried in image URLs by the outlets' CDNs
+URL_WIDTHS = [
+    re.compile(r"[?&](?:width|w|resize)=(\d+)"),     # Guardian, Al Jazeera
+    re.compile(r"[/,_]w_(\d+)"),                      # CNN (q=w_800,c_fill)
+    re.compile(r"/(\d{2,4})x(?:\d{2,4}|n)/"),         # Sky (/768x432/), BBC (/images/ic/480xn/)
+    re.compile(r"//ichef\.[^/]+/(?:news|ace/\w+)/(\d{2,4})/"),   # BBC ichef (/news/976/, /ace/ws/640/)
+    re.compile(r"-(\d{2,4})x\d{2,4}\.\w+$"),          # WordPress (name-300x200.jpg)
+]
+
+# Path pieces that differ between renditions of one asset: BBC ichef's
+# /news/976/ and /ace/standard/480/ prefixes with the cpsprodpb or
+# branded_news bucket after them, WxH segments, and WordPress -WxH suffixes
+RENDITION_PREFIX = re.compile(r"^/(?:news|ace/\w+)/\d{2,4}/(?:cpsprodpb/|branded_news/)?")
+SIZE_SEGMENT = re.compile(r"^\d{2,4}x(?:\d{2,4}|n)$")
+SIZE_SUFFIX  = re.compile(r"-\d{2,4}x\d{2,4}(?=\.\w+$)")
+
+
+def parse_srcset(srcset):
+    """(url, width) pairs from a srcset attribute.
+
+    Follows the HTML tokenising rules: a candidate URL is a run of
+    non-whitespace and may itself contain commas (CNN's w_800,c_fill),
+    only trailing commas separate candidates. Density descriptors (2x)
+    and missing descriptors give width None.
+    """
+    out = []
+    pos, n = 0, len(srcset or "")
+    while pos < n:
+        while pos < n and (srcset[pos].isspace() or srcset[pos] == ","):
+            pos += 1
+        start = pos
+        while pos < n and not srcset[pos].isspace():
+            pos += 1
+        url = srcset[start:pos]
+        descriptors = ""
+        if url.endswith(","):
+            url = url.rstrip(",")
+        else:
+            start = pos
+            while pos < n and srcset[pos] != ",":
+                pos += 1
+            descriptors = srcset[start:pos].strip()
+        if not url:
+            continue
+        width = None
+        for descriptor in descriptors.split():
+            if descriptor.endswith("w") and descriptor[:-1].isdigit():
+                width = int(descriptor[:-1])
+        out.append((url, width))
+    return out
+
+
+def url_width(url):
+    for pattern in URL_WIDTHS:
+        m = pattern.search(url)
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def asset_key(url):
+    """Identity of the underlying picture, shared by all of its renditions."""
+    parts = urlsplit(url)
+    path = parts.path
+    if parts.netloc.lower().startswith("ichef."):
+        path = RENDITION_PREFIX.sub("/", path)
+    segments = [s for s in path.split("/") if s and not SIZE_SEGMENT.match(s)]
+    path = SIZE_SUFFIX.sub("", "/".join(segments))
+    if path.endswith(".webp") and path.count(".") > 1:
+        path = path[:-len(".webp")]
+    return parts.netloc.lower() + "/" + path
+
+
+def compact_images(candidates):
+    """One URL per asset: the widest rendition, assets in first-seen order.
+
+    candidates are (url, width) pairs; width None falls back to any width
+    hinted in the URL itself. Returns (images, display image).
+    """
+    best = {}
+    for url, width in candidates:
+        if not url or not url.startswith("http"):
+            continue
+        width = width or url_width(url) or 0
+        key = asset_key(url)
+        if key not in best or width > best[key][1]:
+            best[key] = (url, width)
+    images = [url for url, _ in best.values()]
+    return images, (images[0] if images else None)
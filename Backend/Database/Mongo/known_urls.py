@@ -0,0 +1,67 @@
+import os
+import json
+from bson import ObjectId
+from url_normalizer import normalize_url
+
+
+class KnownUrls:
+    """URLs already ingested into the articles collection.
+
+    The set is snapshotted to disk together with the highest _id it has
+    seen, so warming on the next run only reads articles inserted since.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = set()
+        self.last_id = None
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                self.keys = set(snapshot.get("urls", []))
+                if snapshot.get("last_id"):
+                    self.last_id = ObjectId(snapshot["last_id"])
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable URL snapshot {path}: {e}")
+                self.keys, self.last_id = set(), None
+
+    def warm(self, collection):
+        """Pull in every article inserted since the snapshot was taken."""
+        query = {"_id": {"$gt": self.last_id}} if self.last_id else {}
+        added = 0
+        for doc in collection.find(query, {"url": 1, "url_key": 1}).sort("_id", 1):
+            key = doc.get("url_key") or (doc.get("url") and normalize_url(doc["url"]))
+            if key:
+                self.keys.add(key)
+                added += 1
+            self.last_id = doc["_id"]
+        if added:
+            self.dirty = True
+        print(f"📚 Known URLs: {len(self.keys)} ({added} loaded from Mongo)")
+
+    def __contains__(self, url):
+        return normalize_url(url) in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, url):
+        key = normalize_url(url)
+        if key not in self.keys:
+            self.keys.add(key)
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "last_id": str(self.last_id) if self.last_id else None,
+                "urls": sorted(self.keys),
+            }, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
@@ -0,0 +1,100 @@
+import re
+import hashlib
+from collections import Counter, deque
+
+# ====== SimHash Settings ======
+SHINGLE_SIZE  = 3       # words per shingle
+MIN_WORDS     = 40      # shorter texts are too noisy to fingerprint
+BITS          = 64
+BANDS         = 4       # 4 x 16-bit bands: distance <= 3 shares at least one band
+MAX_DISTANCE  = 3
+INDEX_SIZE    = 50000   # most recent canonical articles kept in memory
+
+WORD = re.compile(r"\w+")
+BAND_BITS = BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def simhash(text):
+    """64-bit SimHash of the text's word 3-shingles, or None if it is too short."""
+    words = WORD.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+
+    shingles = Counter(
+        " ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)
+    )
+    weights = [0] * BITS
+    for shingle, count in shingles.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+
+    sig = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            sig |= 1 << bit
+    return sig
+
+
+def to_hex(sig):
+    """Stored form: Mongo has no unsigned 64-bit integers."""
+    return format(sig, "016x")
+
+
+def bands(sig):
+    return [(sig >> (i * BAND_BITS)) & BAND_MASK for i in range(BANDS)]
+
+
+class SimHashIndex:
+    """LSH index over the signatures of recent canonical articles.
+
+    Signatures are bucketed by each of their four 16-bit bands, so any
+    signature within MAX_DISTANCE bits of a query shares at least one
+    bucket with it and only those few candidates are compared.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, size=INDEX_SIZE):
+        self.max_distance = max_distance
+        self.size = size
+        self.buckets = [{} for _ in range(BANDS)]
+        self.order = deque()
+
+    def __len__(self):
+        return len(self.order)
+
+    def add(self, sig, key):
+        entry = (sig, key)
+        self.order.append(entry)
+        for i, band in enumerate(bands(sig)):
+            self.buckets[i].setdefault(band, []).append(entry)
+        if len(self.order) > self.size:
+            self._evict(self.order.popleft())
+
+    def _evict(self, entry):
+        for i, band in enumerate(bands(entry[0])):
+            bucket = self.buckets[i][band]
+            bucket.remove(entry)
+            if not bucket:
+                del self.buckets[i][band]
+
+    def match(self, sig):
+        """Key of the closest indexed signature within max_distance, or None."""
+        best, best_distance = None, self.max_distance + 1
+        for i, band in enumerate(bands(sig)):
+            for other, key in self.buckets[i].get(band, ()):
+                distance = (sig ^ other).bit_count()
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        return best
+
+    def warm(self, collection):
+        """Load the most recent canonical articles' signatures from Mongo."""
+        query = {"simhash": {"$exists": True}, "duplicate_of": {"$exists": False}}
+        docs = list(
+            collection.find(query, {"simhash": 1, "url_key": 1}).sort("_id", -1).limit(self.size)
+        )
+        for doc in reversed(docs):
+            if doc.get("url_key"):
+                self.add(int(doc["simhash"], 16), doc["url_key"])
+        print(f"🧬 SimHash index: {len(self)} recent articles")
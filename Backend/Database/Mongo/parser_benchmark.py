@@ -0,0 +1,40 @@
+import sys
+import time
+import argparse
+import html_parser
+from crawl_benchmark import outlet_pages, select_adapters
+from fixture_store import FixtureStore
+
+def time_backend(fn, pages, backend, repeat):
+    html_parser.BACKEND = backend
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url, html in pages:
+            fn(html, url)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (len(pages) * repeat)
+
+def run_benchmark(store, adapters, repeat=5):
+    backends = [b for b in ("bs4", "lxml") if b in html_parser.BACKENDS]
+    print(f"{'outlet':<14} {'page':<8} {'pages':>5} " + " ".join(f"{b + ' ms':>10}" for b in backends) + f" {'speedup':>8}")
+
+    for adapter in adapters:
+        for kind, fn in (("section", adapter.parse_section), ("article", adapter.parse_article)):
+            pages = [(url, store.load(url)[2].decode("utf-8", errors="replace"))
+                     for url in outlet_pages(store, adapter, kind)]
+            if not pages:
+                continue
+            ms = {b: time_backend(fn, pages, b, repeat) for b in backends}
+            speedup = f"{ms['bs4'] / ms['lxml']:.1f}x" if "lxml" in ms else "-"
+            print(f"{adapter.name:<14} {kind:<8} {len(pages):>5} " + " ".join(f"{ms[b]:>10.2f}" for b in backends) + f" {speedup:>8}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compare scraper parse time per backend on recorded fixtures.")
+    ap.add_argument("store", help="fixture store written by crawl_benchmark.py record")
+    ap.add_argument("outlets", nargs="*", help="e.g. bbc cnn skynews (default: all)")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    store = FixtureStore(args.store)
+    if not len(store):
+        sys.exit(f"❌ No recorded pages in {args.store}")
+    run_benchmark(store, select_adapters(args.outlets), args.repeat)
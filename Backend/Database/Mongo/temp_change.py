@@ -11,7 +11,11 @@ db = client["news_db"]
 collection = db["articles"]
 
 def remove_duplicates():
-    """Keep only the newest version of each article"""
+    """Keep only the newest version of each article
+
+    Only needed for articles stored before url_key existed; new inserts
+    are kept unique by the url_key index (see backfill_url_key.py).
+    """
     pipeline = [
         {"$sort": {"date": -1}},  # Newest first
         {"$group": {
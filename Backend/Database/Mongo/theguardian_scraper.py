@@ -1,20 +1,9 @@
-import os
 import re
-import requests
-from datetime import datetime
-from bs4 import BeautifulSoup
-from pymongo import MongoClient
-import concurrent.futures
-from dotenv import load_dotenv
+import html_parser
 from dateutil import parser, tz
-
-load_dotenv()
-
-# ====== MongoDB Connection ======
-MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
-db = client["news_db"]
-collection = db["articles"]
+from crawl_engine import SiteAdapter, run_crawl
+from html_parser import css
+from image_sets import compact_images, parse_srcset
 
 # ====== The Guardian Section URLs ======
 URLS = [
@@ -29,6 +18,19 @@ URLS = [
     "https://www.theguardian.com/business"
 ]
 
+# ====== The Guardian Feeds & Sitemaps ======
+FEEDS = [
+    "https://www.theguardian.com/sitemaps/news.xml",
+    "https://www.theguardian.com/world/rss",
+    "https://www.theguardian.com/us-news/rss",
+    "https://www.theguardian.com/uk-news/rss",
+    "https://www.theguardian.com/environment/rss",
+    "https://www.theguardian.com/science/rss",
+    "https://www.theguardian.com/global-development/rss",
+    "https://www.theguardian.com/technology/rss",
+    "https://www.theguardian.com/business/rss"
+]
+
 headers = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -37,147 +39,104 @@ headers = {
     )
 }
 
-def normalize_url(url):
-    """Remove fragments and query parameters from URL for deduplication"""
-    url = url.split('#')[0]  # Remove fragment
-    url = url.split('?')[0]  # Remove query parameters
-    return url
-
-def scrape_section(url):
-    try:
-        print(f"🔍 Scraping section: {url}")
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        out = []
-        # Look for article links - they typically contain a date in the path
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            # Filter for article links (containing /2025/ for current year)
-            if (href.startswith("/") and 
-                re.match(r"/[a-z-]+/\d{4}/[a-z]{3}/\d{2}/", href)):
-                full_url = "https://www.theguardian.com" + href
-                out.append({"url": full_url})
-        
-        print(f"✅ Found {len(out)} articles in {url}")
-        return out
-
-    except Exception as e:
-        print(f"❌ Error scraping section {url}: {e}")
-        return []
-
-def get_full_article(article):
-    url = article["url"]
-    try:
-        r = requests.get(url, headers=headers, timeout=10)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        # --- Title ---
-        h1 = soup.find("h1")
-        title = h1.get_text(strip=True) if h1 else None
-
-        # --- Date ---
-        pub_date = None
-        # Look for date in meta tags first as it's more reliable
-        meta_date = soup.find("meta", property="article:published_time")
-        if meta_date and meta_date.get("content"):
-            dt = parser.parse(meta_date["content"])
+# ====== Pre-compiled Selectors ======
+SELECTORS = {
+    "links":      css("a[href]"),
+    "title":      css("h1"),
+    "meta_date":  css('meta[property="article:published_time"]'),
+    "date":       css('span[class*="dcr-u0h1qy"]'),
+    "body":       css('div[class*="article-body"]'),
+    "body_alt":   css("div#maincontent"),
+    "paras":      css('p[class*="dcr-"]'),
+    "meta_image": css('meta[property="og:image"]'),
+    "pictures":   css('picture[class*="dcr-"]'),
+    "sources":    css("source"),
+}
+
+ARTICLE_PATH = re.compile(r"/[a-z-]+/\d{4}/[a-z]{3}/\d{2}/")
+
+def parse_section(html, url):
+    page = html_parser.parse(html)
+
+    out = []
+    # Look for article links - they typically contain a date in the path
+    for a in page.select(SELECTORS["links"]):
+        href = page.attr(a, "href")
+        # Filter for article links (containing /2025/ for current year)
+        if href.startswith("/") and ARTICLE_PATH.match(href):
+            full_url = "https://www.theguardian.com" + href
+            out.append({"url": full_url})
+    return out
+
+def parse_article(html, url):
+    page = html_parser.parse(html)
+
+    # --- Title ---
+    h1 = page.select_one(SELECTORS["title"])
+    title = page.text(h1) if h1 is not None else None
+
+    # --- Date ---
+    pub_date = None
+    # Look for date in meta tags first as it's more reliable
+    meta_date = page.select_one(SELECTORS["meta_date"])
+    if meta_date is not None and page.attr(meta_date, "content"):
+        dt = parser.parse(page.attr(meta_date, "content"))
+        pub_date = dt.astimezone(tz.gettz("Asia/Kuala_Lumpur")).replace(tzinfo=None)
+    else:
+        # Fallback to visible date in the page
+        date_tag = page.select_one(SELECTORS["date"])
+        if date_tag is not None:
+            txt = page.text(date_tag)
+            dt = parser.parse(txt, fuzzy=True)
             pub_date = dt.astimezone(tz.gettz("Asia/Kuala_Lumpur")).replace(tzinfo=None)
-        else:
-            # Fallback to visible date in the page
-            date_tag = soup.find("span", class_=re.compile("dcr-u0h1qy"))
-            if date_tag:
-                txt = date_tag.get_text(strip=True)
-                dt = parser.parse(txt, fuzzy=True)
-                pub_date = dt.astimezone(tz.gettz("Asia/Kuala_Lumpur")).replace(tzinfo=None)
-
-        # --- Content ---
-        article_body = soup.find("div", class_=re.compile("article-body"))
-        if not article_body:
-            article_body = soup.find("div", id="maincontent")
-        
-        content = ""
-        if article_body:
-            paras = article_body.find_all("p", class_=re.compile("dcr-"))
-            content = "\n".join(p.get_text(strip=True) for p in paras if p.get_text(strip=True))
-
-        # --- Images ---
-        images = []
-        # Get main image from meta tag (with parameters)
-        meta_image = soup.find("meta", property="og:image")
-        if meta_image and meta_image.get("content"):
-            images.append(meta_image["content"])  # Keep full URL with parameters
-        
-        # Get additional images from picture elements
-        for picture in soup.find_all("picture", class_=re.compile("dcr-")):
-            sources = picture.find_all("source")
-            for source in sources:
-                if source.get("srcset"):
-                    # Extract all URLs from srcset and take the first complete URL
-                    srcset = source["srcset"]
-                    # Split by commas and take first URL (may include parameters)
-                    first_url = srcset.split(',')[0].split()[0]
-                    if first_url.startswith("https://"):
-                        images.append(first_url)
-                        break  # Only need one URL per picture element
-
-        # Skip if essential data missing
-        if not title or not content:
-            print(f"⚠️ Skipping (no title/content): {url}")
-            return
-
-        doc = {
-            "title": title,
-            "url": url,
-            "content": content,
-            "date": pub_date,
-            "images": list(set(images)),  # Remove duplicates
-        }
-
-        # Normalize URL for deduplication
-        clean_url = normalize_url(url)
-        res = collection.update_one(
-            {"url": {"$regex": f"^{re.escape(clean_url)}(#|\?|$)"}},
-            {"$setOnInsert": doc},
-            upsert=True
-        )
-        if res.upserted_id:
-            print(f"✅ Saved: {title[:60]}...")
-            return True
-        return False
-
-    except Exception as e:
-        print(f"❌ Error processing article {url}: {e}")
-        return False
 
-def scrape_all_sections():
-    seen = set()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as exec1:
-        all_lists = exec1.map(scrape_section, URLS)
-        all_articles = [item for sub in all_lists for item in sub]
-
-    if not all_articles:
-        print("⚠️ No articles found!")
-        return
-
-    # Deduplicate using normalized URLs
-    unique = []
-    for art in all_articles:
-        clean = normalize_url(art["url"])
-        if clean not in seen:
-            seen.add(clean)
-            unique.append(art)
+    # --- Content ---
+    article_body = page.select_one(SELECTORS["body"])
+    if article_body is None:
+        article_body = page.select_one(SELECTORS["body_alt"])
     
-    print(f"🔎 Total unique articles to process: {len(unique)}")
+    content = ""
+    if article_body is not None:
+        paras = page.select(SELECTORS["paras"], article_body)
+        content = "\n".join(t for t in (page.text(p) for p in paras) if t)
+
+    # --- Images ---
+    candidates = []
+    # Main image from meta tag first (full URL with parameters), so it is the display image
+    meta_image = page.select_one(SELECTORS["meta_image"])
+    if meta_image is not None and page.attr(meta_image, "content"):
+        candidates.append((page.attr(meta_image, "content"), None))
+
+    # Every rendition offered by picture elements; compaction keeps the widest per asset
+    for picture in page.select(SELECTORS["pictures"]):
+        for source in page.select(SELECTORS["sources"], picture):
+            candidates.extend(parse_srcset(page.attr(source, "srcset")))
+    images, image = compact_images(candidates)
+
+    # Skip if essential data missing
+    if not title or not content:
+        return None
+
+    return {
+        "title": title,
+        "url": url,
+        "content": content,
+        "date": pub_date,
+        "images": images,
+        "image": image,
+    }
+
+ADAPTER = SiteAdapter(
+    name="The Guardian",
+    urls=URLS,
+    headers=headers,
+    parse_section=parse_section,
+    parse_article=parse_article,
+    feeds=FEEDS
+)
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as exec2:
-        results = list(exec2.map(get_full_article, unique))
-
-    saved_count = sum(1 for r in results if r)
-    print(f"✅ Scraping finished. Articles saved: {saved_count} / {len(unique)}")
-    print("🎉 The Guardian scraping complete.")
+def scrape_all_sections():
+    run_crawl([ADAPTER])
 
 if __name__ == "__main__":
-    scrape_all_sections()
\ No newline at end of file
+    scrape_all_sections()
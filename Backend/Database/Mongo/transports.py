@@ -0,0 +1,116 @@
+import asyncio
+import aiohttp
+from multidict import CIMultiDict
+
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+# Network failures worth retrying (timeouts, resets, DNS hiccups)
+TRANSIENT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+class Response:
+    """A fully read response, independent of where it came from."""
+
+    def __init__(self, url, status, headers, body, encoding=None):
+        self.url = url
+        self.status = status
+        self.headers = CIMultiDict(headers)
+        self.body = body
+        self.encoding = encoding or "utf-8"
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPError(self.status, self.url)
+
+    def text(self):
+        return self.body.decode(self.encoding, errors="replace")
+
+
+def charset_of(headers):
+    content_type = headers.get("Content-Type", "")
+    for part in content_type.split(";")[1:]:
+        key, _, value = part.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"')
+    return None
+
+
+class HttpTransport:
+    """Live fetches through one pooled aiohttp session."""
+
+    def __init__(self, total_limit, per_host_limit, timeout):
+        self.total_limit = total_limit
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.session = None
+
+    async def start(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.total_limit,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, url, headers, kind):
+        async with self.session.get(url, headers=headers) as r:
+            body = await r.read()
+            return Response(url, r.status, r.headers, body, r.get_encoding() if body else None)
+
+
+class ReplayTransport:
+    """Serves responses from a FixtureStore; unknown URLs answer 404."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def get(self, url, headers, kind):
+        recorded = await asyncio.to_thread(self.store.load, url)
+        if recorded is None:
+            return Response(url, 404, {}, b"")
+        status, response_headers, body = recorded
+        return Response(url, status, response_headers, body, charset_of(response_headers))
+
+
+class RecordingTransport:
+    """Wraps another transport and saves every successful response."""
+
+    def __init__(self, inner, store):
+        self.inner = inner
+        self.store = store
+
+    async def start(self):
+        await self.inner.start()
+
+    async def close(self):
+        await self.inner.close()
+        self.store.flush()
+
+    async def get(self, url, headers, kind):
+        # Always ask for the full page so the fixture has a body to replay
+        headers = {k: v for k, v in headers.items() if k not in CONDITIONAL_HEADERS}
+        r = await self.inner.get(url, headers, kind)
+        if r.status == 200:
+            await asyncio.to_thread(self.store.save, url, r.status, r.headers, r.body, kind)
+        return r
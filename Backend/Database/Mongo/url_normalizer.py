@@ -0,0 +1,37 @@
+from urllib.parse import urlsplit
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# Other hosts an outlet serves the same articles from (feeds, sitemaps and
+# section pages don't always agree), folded into the host we crawl
+HOST_ALIASES = {
+    "cnn.com": "edition.cnn.com",
+    "www.cnn.com": "edition.cnn.com",
+    "us.cnn.com": "edition.cnn.com",
+    "bbc.com": "www.bbc.com",
+    "bbc.co.uk": "www.bbc.com",
+    "www.bbc.co.uk": "www.bbc.com",
+    "theguardian.com": "www.theguardian.com",
+    "aljazeera.com": "www.aljazeera.com",
+}
+
+
+def normalize_url(url):
+    """Canonical form of an article URL, stored on each article as url_key.
+
+    - scheme folded to https (every outlet we crawl serves https)
+    - host lower-cased, default port and trailing dot removed, and
+      outlet aliases (HOST_ALIASES) folded into one host
+    - query string and fragment dropped
+    - trailing slash removed from the path
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+
+    host = (parts.hostname or "").rstrip(".")
+    host = HOST_ALIASES.get(host, host)
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/")
+    return f"https://{host}{path}"
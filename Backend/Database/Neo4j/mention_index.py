@@ -0,0 +1,80 @@
+from bisect import bisect_right
+from collections import deque
+
+
+def _is_word(char):
+    return char.isalnum() or char == "_"
+
+
+def _at_boundary(text, pos):
+    """Regex \\b: a word character on exactly one side of pos."""
+    left = pos > 0 and _is_word(text[pos - 1])
+    right = pos < len(text) and _is_word(text[pos])
+    return left != right
+
+
+def _lower(text):
+    # Keep offsets aligned with the original text: the few characters
+    # whose lowercase form is longer than one character stay as they are
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class MentionIndex:
+    """Aho-Corasick automaton over entity labels.
+
+    Finds every case-insensitive, word-bounded occurrence of every label
+    (the matches of re.search(rf'\\b{label}\\b', text, re.I), for all
+    labels at once) in a single pass over the text.
+    """
+
+    def __init__(self, labels):
+        self.lengths = [len(label) for label in labels]
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for idx, label in enumerate(labels):
+            state = 0
+            for char in _lower(label):
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            if label:
+                self.out[state].append(idx)
+
+        # Breadth-first failure links; each state inherits the outputs of its fallback
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text):
+        """Yield (start, end, label index) for each word-bounded match."""
+        state = 0
+        for pos, char in enumerate(_lower(text)):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for idx in self.out[state]:
+                start = pos + 1 - self.lengths[idx]
+                if _at_boundary(text, start) and _at_boundary(text, pos + 1):
+                    yield start, pos + 1, idx
+
+    def by_sentence(self, text, sentences):
+        """{sentence number: label indices mentioned in it} for (start, end) sentence spans."""
+        starts = [start for start, _ in sentences]
+        found = {}
+        for start, end, idx in self.find(text):
+            n = bisect_right(starts, start) - 1
+            if n >= 0 and end <= sentences[n][1]:
+                found.setdefault(n, set()).add(idx)
+        return found
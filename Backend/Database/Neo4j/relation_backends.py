@@ -0,0 +1,170 @@
+import os
+import json
+import torch
+from transformers import AutoModelForSequenceClassification
+from relation_cache import model_fingerprint
+
+# ====== Backend Settings ======
+# torch: fp32 PyTorch (default); onnx: int8 dynamically quantized ONNX Runtime
+RELATION_BACKEND = os.getenv("RELATION_BACKEND", "torch")
+ONNX_DIR = os.getenv("RELATION_ONNX_DIR")           # default: <model_path>-onnx
+PARITY_MIN = 0.95          # argmax agreement with torch required to use the onnx model
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relation_fixtures.json")
+MAX_LENGTH = 256
+
+
+def export_dir(model_path):
+    return ONNX_DIR or model_path.rstrip("/\\") + "-onnx"
+
+
+def read_export_state(onnx_dir):
+    """{"fingerprint": checkpoint the export came from, "agreement": parity result once
+    checked, "encoding": RELATION_ENCODING of the fixture prompts it was checked on}."""
+    path = os.path.join(onnx_dir, "export.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_export_state(onnx_dir, state):
+    with open(os.path.join(onnx_dir, "export.json"), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def load_fixture_triples(path=FIXTURES_PATH):
+    """(subj, obj, sentence) triples of the parity / benchmark fixture set."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [(row["subj"], row["obj"], row["sentence"]) for row in json.load(f)]
+
+
+class TorchBackend:
+    """The fine-tuned RoBERTa checkpoint in fp32 PyTorch."""
+
+    name = "torch"
+
+    def __init__(self, model_path, tokenizer):
+        self.tokenizer = tokenizer
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        self.model.eval()
+
+    def probabilities(self, prompts):
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True, truncation=True, max_length=MAX_LENGTH)
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+        return torch.softmax(outputs.logits, dim=1)
+
+
+class OnnxBackend:
+    """The same checkpoint exported to ONNX, int8-quantized, run by ONNX Runtime.
+
+    The export and quantization happen once per checkpoint: export.json
+    next to the quantized file records the model_fingerprint it was made
+    from, and a changed checkpoint is exported again.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path, tokenizer, onnx_dir=None):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise RuntimeError("RELATION_BACKEND=onnx needs the onnxruntime package") from None
+
+        self.tokenizer = tokenizer
+        self.onnx_dir = onnx_dir or export_dir(model_path)
+        self.path = os.path.join(self.onnx_dir, "model.int8.onnx")
+        self.state = read_export_state(self.onnx_dir)
+        fingerprint = model_fingerprint(model_path)
+        if not os.path.exists(self.path) or self.state.get("fingerprint") != fingerprint:
+            self.export(model_path)
+            self.state = {"fingerprint": fingerprint}
+            write_export_state(self.onnx_dir, self.state)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def export(self, model_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        os.makedirs(self.onnx_dir, exist_ok=True)
+        fp32_path = os.path.join(self.onnx_dir, "model.onnx")
+        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        model.eval()
+        sample = self.tokenizer(["export sample"], return_tensors="pt")
+        print(f"📦 Exporting relation classifier to {fp32_path}")
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=14,
+        )
+        quantize_dynamic(fp32_path, self.path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+        print(f"✅ Quantized model written to {self.path}")
+
+    def record_agreement(self, agreement, encoding):
+        self.state["agreement"] = agreement
+        self.state["encoding"] = encoding
+        write_export_state(self.onnx_dir, self.state)
+
+    def probabilities(self, prompts):
+        inputs = self.tokenizer(prompts, return_tensors="np", padding=True, truncation=True, max_length=MAX_LENGTH)
+        feed = {k: v.astype("int64") for k, v in inputs.items() if k in self.input_names}
+        logits = self.session.run(["logits"], feed)[0]
+        return torch.softmax(torch.from_numpy(logits), dim=1)
+
+
+def argmax_agreement(reference, candidate, prompts, batch_size=16):
+    """Share of prompts whose top RELATION_LABELS index is the same under both backends."""
+    agree = 0
+    for start in range(0, len(prompts), batch_size):
+        batch = prompts[start:start + batch_size]
+        ref = reference.probabilities(batch).argmax(dim=1)
+        cand = candidate.probabilities(batch).argmax(dim=1)
+        agree += int((ref == cand).sum())
+    return agree / len(prompts)
+
+
+def load_backend(name, model_path, tokenizer, fixture_prompts=None, encoding=None):
+    """The configured inference backend.
+
+    An onnx export has to agree with torch on the fixture set
+    (PARITY_MIN) before it is used; otherwise torch is used instead. The
+    result is saved with the export under the encoding the fixture
+    prompts were built with, so a check is not repeated (or re-exported)
+    until the checkpoint or the encoding changes.
+    """
+    if name == "torch":
+        return TorchBackend(model_path, tokenizer)
+    if name != "onnx":
+        raise ValueError(f"Unknown RELATION_BACKEND {name!r}; choose torch or onnx")
+
+    onnx_dir = export_dir(model_path)
+    state = read_export_state(onnx_dir)
+    if (state.get("fingerprint") == model_fingerprint(model_path) and state.get("encoding") == encoding
+            and state.get("agreement", 1.0) < PARITY_MIN):
+        print(f"⚠️ The ONNX export of this checkpoint failed the parity check "
+              f"({state['agreement']:.1%} < {PARITY_MIN:.0%}); using torch")
+        return TorchBackend(model_path, tokenizer)
+
+    backend = OnnxBackend(model_path, tokenizer, onnx_dir)
+    checked = "agreement" in backend.state and backend.state.get("encoding") == encoding
+    if not checked and fixture_prompts:
+        reference = TorchBackend(model_path, tokenizer)
+        agreement = argmax_agreement(reference, backend, fixture_prompts)
+        backend.record_agreement(agreement, encoding)
+        print(f"🔍 ONNX int8 argmax agreement with torch: {agreement:.1%} on {len(fixture_prompts)} fixtures")
+        if agreement < PARITY_MIN:
+            print(f"⚠️ Below {PARITY_MIN:.0%}; using torch")
+            return reference
+    return backend
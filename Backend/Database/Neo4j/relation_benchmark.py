@@ -0,0 +1,130 @@
+import io
+import os
+import time
+import statistics
+import argparse
+import contextlib
+import spacy
+from relationship_classifier import (
+    collection, relation_candidates, predict_relationship, predict_relationships_batch,
+    format_relation_markers, encode_relation_input,
+    model_path, tokenizer, RELATION_BATCH_SIZE, RELATION_ENCODING
+)
+from relation_backends import argmax_agreement, load_backend, load_fixture_triples
+import relationship_classifier
+
+
+def load_triples(docs, max_pairs):
+    """Relation candidates from stored articles, as process_document builds them."""
+    nlp = spacy.load("en_core_web_sm")
+    triples = []
+    query = {"entities": {"$exists": True, "$ne": []}, "content": {"$exists": True, "$ne": ""}}
+    for doc in collection.find(query).limit(docs):
+        triples.extend(relation_candidates(doc, nlp))
+        if len(triples) >= max_pairs:
+            break
+    return triples[:max_pairs]
+
+
+def timed(fn, *args):
+    """(result, seconds), with the classifier's debug printing silenced."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - start
+
+
+def single(triples):
+    return [predict_relationship(*triple, use_cache=False) for triple in triples]
+
+
+def compare_batching(triples, batch_sizes):
+    baseline, elapsed = timed(single, triples)
+    print(f"{'method':<12} {'pairs':>6} {'pairs/s':>9} {'agree':>7}")
+    print(f"{'per-pair':<12} {len(triples):>6} {len(triples) / elapsed:>9.2f} {'-':>7}")
+    for size in batch_sizes:
+        results, elapsed = timed(predict_relationships_batch, triples, size, None, False)
+        agree = sum(a[0] == b[0] for a, b in zip(baseline, results)) / len(triples)
+        print(f"{'batch=' + str(size):<12} {len(triples):>6} {len(triples) / elapsed:>9.2f} {agree:>7.1%}")
+
+
+def compare_encodings(triples, batch_size):
+    """Tokens per pair, throughput and label agreement of each input encoding vs the prompt."""
+    placed = sum(format_relation_markers(*triple) is not None for triple in triples)
+    print(f"🏷️ Entity markers placed for {placed}/{len(triples)} pairs (others fall back to the prompt)")
+
+    print(f"{'encoding':<9} {'tokens/pair':>12} {'pairs/s':>9} {'agree':>7}")
+    baseline = None
+    for encoding in ("prompt", "markers"):
+        inputs = [encode_relation_input(*triple, encoding) for triple in triples]
+        tokens = tokenizer(inputs, truncation=True, max_length=256)["input_ids"]
+        results, elapsed = timed(predict_relationships_batch, triples, batch_size, encoding, False)
+        baseline = baseline or results
+        agree = sum(a[0] == b[0] for a, b in zip(baseline, results)) / len(triples)
+        print(f"{encoding:<9} {statistics.mean(map(len, tokens)):>12.1f} "
+              f"{len(triples) / elapsed:>9.2f} {agree:>7.1%}")
+
+
+def compare_cache(triples, batch_size, path):
+    """Cold vs warm pass through a fresh relation cache."""
+    if os.path.exists(path):
+        raise SystemExit(f"❌ {path} already exists; pass a new path for a cold cache")
+    relationship_classifier.relation_cache = None
+    print(f"{'pass':<6} {'pairs/s':>9} {'hit rate':>9}")
+    for name in ("cold", "warm"):
+        cache = relationship_classifier.get_relation_cache(path)
+        cache.stats = {"hits": 0, "misses": 0}
+        _, elapsed = timed(predict_relationships_batch, triples, batch_size)
+        print(f"{name:<6} {len(triples) / elapsed:>9.2f} {cache.hit_rate():>9.1%}")
+    cache.close()
+
+
+def compare_backends(triples, names, batch_size):
+    """Latency (one prompt per call) and throughput (batched) per inference backend."""
+    prompts = [encode_relation_input(*triple) for triple in triples]
+    fixture_prompts = [encode_relation_input(*triple) for triple in load_fixture_triples()]
+    backends = [load_backend(name, model_path, tokenizer, fixture_prompts, RELATION_ENCODING) for name in names]
+
+    print(f"{'backend':<8} {'p50 ms':>8} {'p95 ms':>8} {'pairs/s':>9} {'argmax agree':>13}")
+    for backend in backends:
+        latencies = []
+        for prompt in prompts:
+            start = time.perf_counter()
+            backend.probabilities([prompt])
+            latencies.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for i in range(0, len(prompts), batch_size):
+            backend.probabilities(prompts[i:i + batch_size])
+        rate = len(prompts) / (time.perf_counter() - start)
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        agree = argmax_agreement(backends[0], backend, prompts, batch_size)
+        print(f"{backend.name:<8} {statistics.median(latencies):>8.1f} {p95:>8.1f} {rate:>9.2f} {agree:>13.1%}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark relation classification: batching, input encodings, backends or the result cache.")
+    ap.add_argument("--docs", type=int, default=50)
+    ap.add_argument("--pairs", type=int, default=500)
+    ap.add_argument("--batch-sizes", type=int, nargs="*", default=[8, RELATION_BATCH_SIZE, 32])
+    ap.add_argument("--backends", nargs="*", choices=("torch", "onnx"),
+                    help="compare inference backends instead of batching (first one is the reference)")
+    ap.add_argument("--encodings", action="store_true",
+                    help="compare prompt and entity-marker input encodings")
+    ap.add_argument("--cache", metavar="PATH",
+                    help="time a cold and a warm pass through a new relation cache at PATH")
+    ap.add_argument("--fixtures", action="store_true",
+                    help="use relation_fixtures.json instead of stored articles")
+    args = ap.parse_args()
+
+    triples = load_fixture_triples() if args.fixtures else load_triples(args.docs, args.pairs)
+    if not triples:
+        raise SystemExit("❌ No relation candidates found")
+
+    if args.backends:
+        compare_backends(triples, args.backends, RELATION_BATCH_SIZE)
+    elif args.encodings:
+        compare_encodings(triples, RELATION_BATCH_SIZE)
+    elif args.cache:
+        compare_cache(triples, RELATION_BATCH_SIZE, args.cache)
+    else:
+        compare_batching(triples, args.batch_sizes)
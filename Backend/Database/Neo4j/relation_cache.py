@@ -0,0 +1,96 @@
+import os
+import json
+import sqlite3
+import hashlib
+from collections import OrderedDict
+
+# ====== Relation Cache Settings ======
+RELATION_CACHE_PATH = os.getenv(
+    "RELATION_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "relation_cache.sqlite")
+)
+RELATION_CACHE_SIZE = int(os.getenv("RELATION_CACHE_SIZE", "50000"))   # results kept in memory
+FLUSH_EVERY = 500         # new results buffered before they are written to SQLite
+
+
+def model_fingerprint(model_path):
+    """Changes whenever the files of the fine-tuned checkpoint change."""
+    h = hashlib.sha1(model_path.encode("utf-8"))
+    if os.path.isdir(model_path):
+        for name in sorted(os.listdir(model_path)):
+            stat = os.stat(os.path.join(model_path, name))
+            h.update(f"{name}:{stat.st_size}:{int(stat.st_mtime)}".encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+def relation_key(subj, obj, sentence, model_version):
+    """Cache key: normalized labels and types, a hash of the sentence, and the model version."""
+    sentence_hash = hashlib.sha1(" ".join(sentence.split()).encode("utf-8")).hexdigest()
+    parts = (
+        subj["label"].lower().strip(), subj.get("type", ""),
+        obj["label"].lower().strip(), obj.get("type", ""),
+        sentence_hash, model_version,
+    )
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class RelationCache:
+    """(subj, obj, sentence, model version) -> (top label, probability vector).
+
+    A bounded LRU dict in front of a SQLite table, so re-runs and
+    duplicate wire stories skip the classifier. Only the model output is
+    cached; the threshold / hint rules are applied again on every hit.
+    """
+
+    def __init__(self, path=RELATION_CACHE_PATH, size=RELATION_CACHE_SIZE):
+        self.size = size
+        self.memory = OrderedDict()
+        self.pending = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS relations (key TEXT PRIMARY KEY, label TEXT, probs TEXT)")
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """(label, probs) or None."""
+        value = self.memory.get(key) or self.pending.get(key)
+        if value is None:
+            row = self.db.execute("SELECT label, probs FROM relations WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = (row[0], json.loads(row[1]))
+        if value is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key, label, probs):
+        self._remember(key, (label, probs))
+        self.pending[key] = (label, probs)
+        if len(self.pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = [(key, label, json.dumps(probs)) for key, (label, probs) in self.pending.items()]
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO relations (key, label, probs) VALUES (?, ?, ?)", rows)
+        self.pending.clear()
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def close(self):
+        self.flush()
+        self.db.close()
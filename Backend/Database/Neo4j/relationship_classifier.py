@@ -2,7 +2,10 @@ import os
 import re
 import spacy
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from transformers import AutoTokenizer
+from relation_backends import RELATION_BACKEND, load_backend, load_fixture_triples
+from mention_index import MentionIndex
+from relation_cache import RelationCache, model_fingerprint, relation_key
 from pymongo import MongoClient
 from tqdm import tqdm
 from dotenv import load_dotenv
@@ -50,7 +53,16 @@ RELATION_LABELS = [
 # 1. USE A FINE-TUNED MODEL SPECIFICALLY FOR RELATION CLASSIFICATION
 model_path = "D:/FYP RELATION CLASSIFIER MODEL ROBERTA" 
 tokenizer = AutoTokenizer.from_pretrained(model_path)
-model = AutoModelForSequenceClassification.from_pretrained(model_path)
+
+# Inference backend (RELATION_BACKEND: torch or onnx), loaded on first use
+backend = None
+
+def get_backend():
+    global backend
+    if backend is None:
+        fixture_prompts = [encode_relation_input(*t) for t in load_fixture_triples()]
+        backend = load_backend(RELATION_BACKEND, model_path, tokenizer, fixture_prompts, RELATION_ENCODING)
+    return backend
 
 # 3. ADJUSTED CONFIDENCE THRESHOLD
 CONFIDENCE_THRESHOLD = 0.0030
@@ -58,6 +70,27 @@ CONFIDENCE_THRESHOLD = 0.0030
 # ADDED: Special handling for "Other" class - require higher confidence
 OTHER_CONFIDENCE_THRESHOLD = 0.98
 
+# Classifier input: "prompt" (question template listing every label) or
+# "markers" (bare sentence with <e1>/<e2> tags, as in the SemEval training data)
+RELATION_ENCODING = os.getenv("RELATION_ENCODING", "prompt")
+
+# Prompts per forward pass in predict_relationships_batch
+RELATION_BATCH_SIZE = int(os.getenv("RELATION_BATCH_SIZE", "16"))
+# Documents whose relation candidates are classified together
+DOC_GROUP_SIZE = 8
+
+# Result cache shared across runs, opened on first use
+relation_cache = None
+model_version = None
+
+def get_relation_cache(path=None):
+    global relation_cache, model_version
+    if relation_cache is None:
+        relation_cache = RelationCache(path) if path else RelationCache()
+        # The backend actually serving, which may be torch after a failed onnx parity check
+        model_version = f"{model_fingerprint(model_path)}:{get_backend().name}"
+    return relation_cache
+
 # ===== NEO4J BATCH INGESTION CLASS =====
 class Neo4jIngestor:
     def __init__(self, uri, user, password):
@@ -180,18 +213,35 @@ def format_relation_prompt(subj, obj, sentence):
         f"Choose from: {', '.join(RELATION_LABELS)}"
     )
 
-def predict_relationship(subj, obj, sentence):
-    """Enhanced prediction with better context formatting and rule-based verification"""
-    if not could_have_relation(subj, obj):
-        return "no_relation", [1.0] + [0.0] * (len(RELATION_LABELS) - 1)
+def mention_span(label, sentence):
+    match = re.search(rf'\b{re.escape(label)}\b', sentence, re.I)
+    return match.span() if match else None
 
-    context = format_relation_prompt(subj, obj, sentence)
-    inputs = tokenizer(context, return_tensors="pt", truncation=True, max_length=256)
-    
-    with torch.no_grad():
-        outputs = model(**inputs)
-        probs = torch.softmax(outputs.logits, dim=1).squeeze()
+def format_relation_markers(subj, obj, sentence):
+    """The sentence with SemEval-style entity markers, or None if they cannot be placed"""
+    e1, e2 = mention_span(subj["label"], sentence), mention_span(obj["label"], sentence)
+    if not e1 or not e2 or (e1[0] < e2[1] and e2[0] < e1[1]):
+        return None
+    marked = sentence
+    # Insert from the right so earlier offsets stay valid
+    for (start, end), tag in sorted([(e1, "e1"), (e2, "e2")], reverse=True):
+        marked = f"{marked[:start]}<{tag}>{marked[start:end]}</{tag}>{marked[end:]}"
+    return marked
+
+def encode_relation_input(subj, obj, sentence, encoding=None):
+    """Classifier input for a pair in the configured encoding (prompt when markers cannot be placed)"""
+    if (encoding or RELATION_ENCODING) == "markers":
+        marked = format_relation_markers(subj, obj, sentence)
+        if marked is not None:
+            return marked
+    return format_relation_prompt(subj, obj, sentence)
 
+def classify_prompts(prompts):
+    """Relation probabilities for a batch of prompts: one forward pass, one tensor row each."""
+    return get_backend().probabilities(prompts)
+
+def decide_relation(subj, obj, probs):
+    """Apply the threshold / entity-type hint rules to one row of class probabilities"""
     # Get all probabilities
     probs_list = probs.tolist()
     
@@ -267,6 +317,51 @@ def predict_relationship(subj, obj, sentence):
     print(f"No suitable relation found above threshold {CONFIDENCE_THRESHOLD}")
     return "no_relation", probs_list
 
+def predict_relationship(subj, obj, sentence, encoding=None, use_cache=True):
+    """Enhanced prediction with better context formatting and rule-based verification"""
+    return predict_relationships_batch([(subj, obj, sentence)], encoding=encoding, use_cache=use_cache)[0]
+
+def predict_relationships_batch(triples, batch_size=RELATION_BATCH_SIZE, encoding=None, use_cache=True):
+    """predict_relationship for many (subj, obj, sentence) triples at once.
+
+    Prompts are sorted by token length and cut into batches, so each
+    forward pass pads to a similar length; results come back in input
+    order and go through the same decision logic as predict_relationship.
+    Pairs already classified by this model version come from the
+    relation cache instead of the model.
+    """
+    encoding = encoding or RELATION_ENCODING
+    cache = get_relation_cache() if use_cache else None
+    results = [None] * len(triples)
+    candidates, keys = [], {}
+    for i, (subj, obj, sentence) in enumerate(triples):
+        if not could_have_relation(subj, obj):
+            results[i] = ("no_relation", [1.0] + [0.0] * (len(RELATION_LABELS) - 1))
+            continue
+        if cache is not None:
+            keys[i] = relation_key(subj, obj, sentence, f"{model_version}:{encoding}")
+            cached = cache.get(keys[i])
+            if cached is not None:
+                results[i] = decide_relation(subj, obj, torch.tensor(cached[1]))
+                continue
+        candidates.append(i)
+    if not candidates:
+        return results
+
+    prompts = {i: encode_relation_input(*triples[i], encoding) for i in candidates}
+    lengths = tokenizer(list(prompts.values()), truncation=True, max_length=256)["input_ids"]
+    by_length = [i for _, i in sorted(zip(map(len, lengths), candidates))]
+
+    for start in range(0, len(by_length), batch_size):
+        batch = by_length[start:start + batch_size]
+        probs = classify_prompts([prompts[i] for i in batch])
+        for i, row in zip(batch, probs):
+            subj, obj, _ = triples[i]
+            results[i] = decide_relation(subj, obj, row)
+            if cache is not None:
+                cache.put(keys[i], RELATION_LABELS[int(row.argmax())], row.tolist())
+    return results
+
 def could_have_relation(subj, obj):
     """Quick check if these entity types could possibly have a meaningful relation"""
     # Normalize entity types
@@ -380,74 +475,94 @@ def is_valid_entity(entity):
         
     return True
 
-def process_document(doc, nlp, ingestor):
+def relation_candidates(doc, nlp):
+    """(subj, obj, sentence) triples for every entity pair sharing a sentence of the document"""
     text = doc.get("content", "")
     if not text:
         return []
     
-    relations = []
+    # ONLY USE WIKIDATA-ANNOTATED ENTITIES
+    entities = [entity for entity in doc.get("entities", []) if is_valid_entity(entity)]
+    if len(entities) < 2:
+        return []
+    
+    # Sentence boundaries stored by the NER stage; older articles are split here
+    sentences = doc.get("sentences") or [(sent.start_char, sent.end_char) for sent in nlp(text).sents]
+    mentions = MentionIndex([entity["label"] for entity in entities]).by_sentence(text, sentences)
     
-    for sent in nlp(text).sents:
-        sent_text = sent.text.strip()
+    triples = []
+    
+    for n, found in sorted(mentions.items()):
+        start, end = sentences[n]
+        sent_text = text[start:end].strip()
         if len(sent_text) < 10:
             continue
             
-        # ONLY USE WIKIDATA-ANNOTATED ENTITIES
         sentence_entities = [
             {
-                "label": entity["label"],
-                "type": entity.get("type", "UNKNOWN"),
-                "description": entity.get("description", ""),
-                "wikidata_id": entity.get("wikidata_id", "")
+                "label": entities[i]["label"],
+                "type": entities[i].get("type", "UNKNOWN"),
+                "description": entities[i].get("description", ""),
+                "wikidata_id": entities[i].get("wikidata_id", "")
             }
-            for entity in doc.get("entities", [])
-            if (re.search(rf'\b{re.escape(entity["label"])}\b', sent_text, re.I) 
-                and is_valid_entity(entity))
+            for i in sorted(found)
         ]
         
         # Process entity pairs (only if we have at least 2 valid entities)
         for subj, obj in [(sentence_entities[i], sentence_entities[j]) 
                          for i in range(len(sentence_entities)) 
                          for j in range(i+1, len(sentence_entities))]:
+            triples.append((subj, obj, sent_text))
+    
+    return triples
+
+def process_documents(docs, nlp, ingestor):
+    """Classify the relation candidates of a group of documents in shared batches"""
+    candidates = [(doc, triple) for doc in docs for triple in relation_candidates(doc, nlp)]
+    predictions = predict_relationships_batch([triple for _, triple in candidates])
+    
+    relations = []
+    
+    for (doc, (subj, obj, sent_text)), (rel, probs) in zip(candidates, predictions):
+        if rel != "no_relation" and max(probs) >= CONFIDENCE_THRESHOLD:
+            # Ingest entities
+            ingestor.add_node_to_batch(
+                name=subj["label"],
+                entity_type=get_normalized_entity_type(subj["type"]),
+                source=doc.get("source", "unknown"),
+                description=subj["description"],
+                wikidata_id=subj["wikidata_id"]
+            )
+            ingestor.add_node_to_batch(
+                name=obj["label"],
+                entity_type=get_normalized_entity_type(obj["type"]),
+                source=doc.get("source", "unknown"),
+                description=obj["description"],
+                wikidata_id=obj["wikidata_id"]
+            )
             
-            rel, probs = predict_relationship(subj, obj, sent_text)
+            # Add relation
+            ingestor.add_relation_to_batch(
+                subj["label"],
+                obj["label"],
+                rel,
+                max(probs),
+                sent_text
+            )
             
-            if rel != "no_relation" and max(probs) >= CONFIDENCE_THRESHOLD:
-                # Ingest entities
-                ingestor.add_node_to_batch(
-                    name=subj["label"],
-                    entity_type=get_normalized_entity_type(subj["type"]),
-                    source=doc.get("source", "unknown"),
-                    description=subj["description"],
-                    wikidata_id=subj["wikidata_id"]
-                )
-                ingestor.add_node_to_batch(
-                    name=obj["label"],
-                    entity_type=get_normalized_entity_type(obj["type"]),
-                    source=doc.get("source", "unknown"),
-                    description=obj["description"],
-                    wikidata_id=obj["wikidata_id"]
-                )
-                
-                # Add relation
-                ingestor.add_relation_to_batch(
-                    subj["label"],
-                    obj["label"],
-                    rel,
-                    max(probs),
-                    sent_text
-                )
-                
-                relations.append({
-                    "subject": subj["label"],
-                    "object": obj["label"],
-                    "relation": rel,
-                    "confidence": max(probs),
-                    "sentence": sent_text
-                })
+            relations.append({
+                "subject": subj["label"],
+                "object": obj["label"],
+                "relation": rel,
+                "confidence": max(probs),
+                "sentence": sent_text
+            })
     
     return relations
 
+def process_document(doc, nlp, ingestor):
+    return process_documents([doc], nlp, ingestor)
+
 def main():
     # Load spaCy model
     nlp = spacy.load("en_core_web_sm")
@@ -460,15 +575,19 @@ def main():
         docs = collection.find().limit(50)  # Increased from 5 to 50 for better batching
         all_relations = []
         
+        group = []
         for doc in tqdm(docs):
             print(f"\nProcessing document: {doc['_id']}")
-            relations = process_document(doc, nlp, ingestor)
-            
-            if relations:
-                all_relations.extend(relations)
+            group.append(doc)
+            if len(group) >= DOC_GROUP_SIZE:
+                all_relations.extend(process_documents(group, nlp, ingestor))
+                group = []
+        if group:
+            all_relations.extend(process_documents(group, nlp, ingestor))
         
         # Flush any remaining batches
         ingestor.process_batches()
+        print(f"🗃️ Relation cache hit rate: {get_relation_cache().hit_rate():.1%}")
         
         # Summary of results
         if all_relations:
@@ -484,6 +603,8 @@ def main():
                 
     finally:
         ingestor.close()
+        if relation_cache is not None:
+            relation_cache.close()
 
 if __name__ == "__main__":
     main()
@@ -16,7 +16,10 @@ def normalize_entity_name(entity_name):
     return entity_name.lower().strip()
 
 def select_best_image(images):
-    """Select the highest resolution image available"""
+    """Select the highest resolution image available.
+
+    Only used for legacy articles; new ones carry a precomputed "image".
+    """
     if not images:
         return None
     resolution_order = ['1536', '1586', '1526', '1024', '840', '800', '640', '480', '320', '240']
@@ -39,7 +42,9 @@ def get_recent_articles(limit=10):
             "url": 1,
             "date": 1,
             "_id": 1,
-            "images": 1,
+            "image": 1,
+            # Only legacy articles without a precomputed image need the full list
+            "images": {"$cond": [{"$ifNull": ["$image", False]}, "$$REMOVE", "$images"]},
             "entities": {
                 "$filter": {
                     "input": "$entities",
@@ -63,6 +68,7 @@ def get_recent_articles(limit=10):
             normalized_label = ent.get("label", ent.get("text", ""))
             processed_entities.append({
                 "text": ent.get("text"),
+                "entity_id": ent.get("entity_id"),
                 "normalized_label": normalized_label,
                 "type": ent.get("type"),
                 "wikidata_id": ent.get("wikidata_id"),
@@ -74,7 +80,7 @@ def get_recent_articles(limit=10):
             "title": article["title"],
             "url": article["url"],
             "date": article.get("date"),
-            "image": select_best_image(article.get("images", [])),
+            "image": article.get("image") or select_best_image(article.get("images", [])),
             "entities": processed_entities[:3]  # Limit to 3 entities for display
         })
     
@@ -83,33 +89,28 @@ def get_recent_articles(limit=10):
 def get_popular_entities(limit=10):
     """Fetch most frequently mentioned entities with normalized labels"""
     pipeline = [
-        {"$unwind": "$entities"},
-        # Only count entities that have both text and label
-        {"$match": {
-            "entities.text": {"$exists": True},
-            "entities.label": {"$exists": True}
-        }},
-        # Group by normalized label (not by raw text)
-        {"$group": {
-            "_id": {
-                "normalized_label": "$entities.label",
-                "type": "$entities.type"
-            },
-            "count": {"$sum": 1},
-            # Keep sample data for display
-            "sample_text": {"$first": "$entities.text"},
-            "wikidata_id": {"$first": "$entities.wikidata_id"},
-            "description": {"$first": "$entities.description"}
-        }},
+        {"$match": {"entity_ids": {"$exists": True}}},
+        # Each article counts once per entity it mentions
+        {"$unwind": "$entity_ids"},
+        {"$group": {"_id": "$entity_ids", "count": {"$sum": 1}}},
         {"$sort": {"count": -1}},
         {"$limit": limit},
+        # Display data comes from the entity registry
+        {"$lookup": {
+            "from": "entity_registry",
+            "localField": "_id",
+            "foreignField": "_id",
+            "as": "entity"
+        }},
+        {"$unwind": "$entity"},
         {"$project": {
-            "normalized_label": "$_id.normalized_label",
-            "type": "$_id.type",
+            "entity_id": "$_id",
+            "normalized_label": "$entity.label",
+            "type": "$entity.type",
             "count": 1,
-            "sample_text": 1,
-            "wikidata_id": 1,
-            "description": 1,
+            "sample_text": "$entity.text",
+            "wikidata_id": "$entity.wikidata_id",
+            "description": "$entity.description",
             "_id": 0
         }}
     ]
@@ -1,5 +1,6 @@
 import spacy
 from spacy_entity_linker import EntityLinker
+from span_alignment import align_spans
 
 # Initialize pipeline
 nlp = spacy.load("en_core_web_sm")
@@ -9,22 +10,12 @@ def extract_linked_entities(text):
     doc = nlp(text)
     entities = []
 
-    for linked_ent in doc._.linkedEntities:
-        linker_span = linked_ent.get_span()
-        
-        # 1. First try exact character offset matching (strict)
-        matching_ner = next(
-            (ent for ent in doc.ents if ent.start_char == linker_span.start_char and ent.end_char == linker_span.end_char),
-            None
-        )
-        
-        # 2. Fallback: Match by text (flexible) if offsets don't align
-        if matching_ner is None:
-            matching_ner = next(
-                (ent for ent in doc.ents if linker_span.text.lower() in ent.text.lower()),
-                None
-            )
+    linked_ents = doc._.linkedEntities
+    linker_spans = [linked_ent.get_span() for linked_ent in linked_ents]
+    # Same bounds first, else the NER entity the linker span sits inside
+    matches = align_spans(linker_spans, doc.ents, enclosing=True)
 
+    for linked_ent, linker_span, matching_ner in zip(linked_ents, linker_spans, matches):
         entities.append({
             "text": linker_span.text,
             "type": matching_ner.label_ if matching_ner else "UNKNOWN",
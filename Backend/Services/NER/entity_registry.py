@@ -0,0 +1,200 @@
+import os
+import sys
+from datetime import datetime
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from dotenv import load_dotenv
+
+# Aliases must be normalized exactly as the search bar normalizes queries
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from Services.Search.search_bar import normalize_entity_name
+
+load_dotenv()
+
+# MongoDB setup
+client = MongoClient(os.getenv("MONGO_URI"))
+db = client["news_db"]
+collection = db["test_articles"]
+registry = db["entity_registry"]    # {_id: int, key, label, type, wikidata_id, description, text}
+aliases = db["entity_aliases"]      # {_id: normalized surface form, entity_ids: [int]}
+counters = db["counters"]
+checkpoints = db["pipeline_checkpoints"]
+
+COUNTER_ID = "entity_id"
+BACKFILL_BATCH = 500
+
+
+def entity_key(entity):
+    """Identity of an entity: its Wikidata QID, else its normalized label."""
+    if entity.get("wikidata_id"):
+        return f"Q{entity['wikidata_id']}"
+    return "label:" + normalize_entity_name(entity.get("label") or entity.get("text", ""))
+
+
+def create_indexes():
+    registry.create_index("key", unique=True)
+    aliases.create_index("entity_ids")
+    collection.create_index("entity_ids")
+
+
+class EntityRegistry:
+    """Compact integer IDs for canonical entities, plus their surface forms.
+
+    IDs come from a counters document, allocated in one $inc per batch of
+    new entities. Keys and aliases already seen are remembered in memory,
+    so a warm worker only touches Mongo for entities it has never met.
+    """
+
+    def __init__(self):
+        self.ids = {}           # key -> entity id
+        self.known_aliases = set()
+
+    def _allocate(self, n):
+        """First of n fresh, consecutive IDs."""
+        counter = counters.find_one_and_update(
+            {"_id": COUNTER_ID}, {"$inc": {"seq": n}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return counter["seq"] - n + 1
+
+    def _register(self, new):
+        """Create registry entries for keys not yet in Mongo; key -> entity for each."""
+        stored = {doc["key"]: doc["_id"] for doc in registry.find({"key": {"$in": list(new)}}, {"key": 1})}
+        self.ids.update(stored)
+        missing = [key for key in new if key not in stored]
+        if not missing:
+            return
+
+        first = self._allocate(len(missing))
+        ops = []
+        for offset, key in enumerate(missing):
+            entity = new[key]
+            ops.append(UpdateOne({"key": key}, {"$setOnInsert": {
+                "_id": first + offset,
+                "key": key,
+                "label": entity.get("label") or entity.get("text"),
+                "text": entity.get("text"),
+                "type": entity.get("type"),
+                "wikidata_id": entity.get("wikidata_id"),
+                "description": entity.get("description"),
+            }}, upsert=True))
+        try:
+            registry.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys: another worker registered some of these first; its IDs win
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+        for doc in registry.find({"key": {"$in": missing}}, {"key": 1}):
+            self.ids[doc["key"]] = doc["_id"]
+        unregistered = [key for key in missing if key not in self.ids]
+        if unregistered:
+            raise RuntimeError(f"Entity registry has no entry for {len(unregistered)} keys, e.g. {unregistered[0]!r}")
+
+    def assign(self, entities):
+        """Set entity_id on each entity dict and record its surface forms as aliases.
+
+        Returns the article's distinct entity IDs.
+        """
+        new = {}
+        for entity in entities:
+            key = entity_key(entity)
+            if key not in self.ids:
+                new.setdefault(key, entity)
+        if new:
+            self._register(new)
+
+        alias_ops, entity_ids = [], []
+        for entity in entities:
+            entity_id = self.ids[entity_key(entity)]
+            entity["entity_id"] = entity_id
+            if entity_id not in entity_ids:
+                entity_ids.append(entity_id)
+            alias_ops += self.alias_ops(entity, entity_id)
+        if alias_ops:
+            aliases.bulk_write(alias_ops, ordered=False)
+        return entity_ids
+
+    def alias_ops(self, entity, entity_id):
+        """Upserts adding entity_id to the entity's surface forms not yet recorded.
+
+        A surface form keeps every entity seen under it ("Georgia" the
+        country and the US state).
+        """
+        ops = []
+        for surface in (entity.get("text"), entity.get("label")):
+            alias = normalize_entity_name(surface or "")
+            if alias and (alias, entity_id) not in self.known_aliases:
+                self.known_aliases.add((alias, entity_id))
+                ops.append(UpdateOne({"_id": alias}, {"$addToSet": {"entity_ids": entity_id}}, upsert=True))
+        return ops
+
+
+def backfill_entity_ids(batch_size=BACKFILL_BATCH):
+    """Stamp entity IDs on articles whose entities were extracted before the registry existed."""
+    create_indexes()
+    entity_registry = EntityRegistry()
+    updated, batch = 0, []
+
+    def flush():
+        nonlocal updated
+        if batch:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch.clear()
+
+    query = {"entities": {"$exists": True, "$ne": []}, "entity_ids": {"$exists": False}}
+    for doc in collection.find(query, {"entities": 1}):
+        entities = doc["entities"]
+        entity_ids = entity_registry.assign(entities)
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"entities": entities, "entity_ids": entity_ids}}))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    print(f"✅ entity_ids set on {updated} articles ({len(entity_registry.ids)} entities)")
+
+
+def rebuild_aliases(batch_size=BACKFILL_BATCH):
+    """Re-record every stored entity under its surface forms.
+
+    Brings back the names that used to map to just one entity ID.
+    """
+    create_indexes()
+    # Alias documents written before surface forms kept a set held a single entity_id
+    aliases.update_many({"entity_id": {"$exists": True}}, [
+        {"$set": {"entity_ids": {"$setUnion": [{"$ifNull": ["$entity_ids", []]}, ["$entity_id"]]}}},
+        {"$unset": "entity_id"},
+    ])
+    entity_registry = EntityRegistry()
+    ops, written = [], 0
+    query = {"entity_ids": {"$exists": True, "$ne": []}}
+    for doc in collection.find(query, {"entities": 1}):
+        for entity in doc.get("entities", []):
+            if "entity_id" in entity:
+                ops += entity_registry.alias_ops(entity, entity["entity_id"])
+        if len(ops) >= batch_size:
+            aliases.bulk_write(ops, ordered=False)
+            written += len(ops)
+            ops = []
+    if ops:
+        aliases.bulk_write(ops, ordered=False)
+        written += len(ops)
+    print(f"✅ {written} surface form -> entity links recorded")
+
+
+def ensure_backfilled():
+    """Run backfill_entity_ids and rebuild_aliases once per database.
+
+    Called by the NER worker, so articles extracted before the registry
+    existed show up in search and the popular list without a manual step.
+    """
+    for marker, step in (("entity_ids_backfill", backfill_entity_ids), ("entity_aliases_rebuild", rebuild_aliases)):
+        if checkpoints.find_one({"_id": marker}) is None:
+            step()
+            checkpoints.update_one({"_id": marker}, {"$set": {"done_at": datetime.now()}}, upsert=True)
+
+
+if __name__ == "__main__":
+    if "--aliases" in sys.argv:
+        rebuild_aliases()
+    else:
+        backfill_entity_ids()
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+from collections import OrderedDict
+
+# ====== Link Cache Settings ======
+LINK_CACHE_PATH = os.getenv(
+    "NER_LINK_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "link_cache.sqlite")
+)
+LINK_CACHE_SIZE = int(os.getenv("NER_LINK_CACHE_SIZE", "20000"))   # records kept in memory
+FLUSH_EVERY = 200         # new records buffered before they are written to SQLite
+
+FIELDS = ("wikidata_id", "wikidata_url", "description", "label")
+
+
+def record_of(linked_ent):
+    """The Wikidata fields we store for a linked entity."""
+    return {
+        "wikidata_id": linked_ent.get_id(),
+        "wikidata_url": linked_ent.get_url(),
+        "description": linked_ent.get_description(),
+        "label": linked_ent.get_label()
+    }
+
+
+class LinkCache:
+    """Mention surface -> Wikidata record, shared across worker runs.
+
+    A bounded LRU dict in front of a SQLite table. Surfaces the linker
+    did not resolve are cached as None, so they are not linked again
+    either. The most recently written records are loaded at startup.
+    """
+
+    def __init__(self, path=LINK_CACHE_PATH, size=LINK_CACHE_SIZE):
+        self.size = size
+        self.memory = OrderedDict()
+        self.pending = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Shard processes share the file; WAL lets them read while one writes
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            " surface TEXT PRIMARY KEY, wikidata_id INTEGER, wikidata_url TEXT,"
+            " description TEXT, label TEXT)"
+        )
+        self.warm()
+
+    @staticmethod
+    def key(surface):
+        return " ".join(surface.lower().split())
+
+    @staticmethod
+    def _record(row):
+        return None if row[0] is None else dict(zip(FIELDS, row))
+
+    def warm(self):
+        rows = self.db.execute(
+            f"SELECT surface, {', '.join(FIELDS)} FROM links ORDER BY rowid DESC LIMIT ?",
+            (self.size,)
+        ).fetchall()
+        for surface, *row in reversed(rows):
+            self.memory[surface] = self._record(row)
+
+    def _remember(self, key, record):
+        self.memory[key] = record
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+
+    def lookup(self, surface):
+        """(found, record); record is None for a cached miss."""
+        key = self.key(surface)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.stats["hits"] += 1
+            return True, self.memory[key]
+        if key in self.pending:
+            self.stats["hits"] += 1
+            return True, self.pending[key]
+        row = self.db.execute(
+            f"SELECT {', '.join(FIELDS)} FROM links WHERE surface = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return False, None
+        self.stats["hits"] += 1
+        record = self._record(row)
+        self._remember(key, record)
+        return True, record
+
+    def store(self, surface, record):
+        key = self.key(surface)
+        self._remember(key, record)
+        self.pending[key] = record
+        if len(self.pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = [
+            (key, *(record[f] if record else None for f in FIELDS))
+            for key, record in self.pending.items()
+        ]
+        with self.db:
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO links (surface, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        self.pending.clear()
+
+    def hit_rate(self):
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def close(self):
+        self.flush()
+        self.db.close()
@@ -0,0 +1,82 @@
+import os
+import time
+import argparse
+from spacy.language import Language
+from spacy.tokens import DocBin
+from ner_extraction import get_nlp, collection, extract_filtered_entities, extract_entities_batch
+from link_cache import LinkCache
+
+DEV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dev.spacy")
+
+# Docs seen by the pipeline, i.e. full model passes
+PASSES = {"count": 0}
+
+
+@Language.component("pass_counter")
+def pass_counter(doc):
+    PASSES["count"] += 1
+    return doc
+
+
+def load_texts(source, limit):
+    """Benchmark texts from the annotated dev set or a sample of stored articles."""
+    if source == "mongo":
+        pipeline = [
+            {"$match": {"content": {"$exists": True, "$ne": ""}}},
+            {"$sample": {"size": limit}},
+            {"$project": {"content": 1}},
+        ]
+        return [a["content"] for a in collection.aggregate(pipeline)]
+    docs = DocBin().from_disk(DEV_PATH).get_docs(get_nlp().vocab)
+    return [doc.text for _, doc in zip(range(limit), docs)]
+
+
+def two_pass(texts):
+    """The old worker: nlp.pipe, then extract_filtered_entities(doc.text) runs nlp again."""
+    return [extract_filtered_entities(doc.text) for doc in get_nlp().pipe(texts, batch_size=8)]
+
+
+def single_pass(texts):
+    """The worker's extraction, with a throwaway link cache so the shared one is left alone."""
+    cache = LinkCache(":memory:")
+    try:
+        return [entities for _, entities in extract_entities_batch(({"content": t} for t in texts), cache=cache)]
+    finally:
+        cache.close()
+
+
+def run_benchmark(texts):
+    nlp = get_nlp()
+    # A cascade engine is not a single pipeline; its passes are not counted
+    counting = isinstance(nlp, Language)
+    if counting:
+        nlp.add_pipe("pass_counter", first=True)
+    try:
+        results = {}
+        print(f"{'method':<12} {'docs':>6} {'docs/s':>9} {'passes/doc':>11}")
+        for name, fn in (("two-pass", two_pass), ("single-pass", single_pass)):
+            PASSES["count"] = 0
+            start = time.perf_counter()
+            results[name] = fn(texts)
+            elapsed = time.perf_counter() - start
+            passes = f"{PASSES['count'] / len(texts):.2f}" if counting else "-"
+            print(f"{name:<12} {len(texts):>6} {len(texts) / elapsed:>9.2f} {passes:>11}")
+    finally:
+        if counting:
+            nlp.remove_pipe("pass_counter")
+
+    same = results["two-pass"] == results["single-pass"]
+    print("✅ Identical entities from both methods" if same else "⚠️ Entity output differs between methods")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compare NER throughput with one vs two model passes per article.")
+    ap.add_argument("--source", choices=("dev", "mongo"), default="dev",
+                    help="dev.spacy texts (default) or a random sample of stored articles")
+    ap.add_argument("--limit", type=int, default=100)
+    args = ap.parse_args()
+
+    texts = load_texts(args.source, args.limit)
+    if not texts:
+        raise SystemExit("❌ No texts to benchmark")
+    run_benchmark(texts)
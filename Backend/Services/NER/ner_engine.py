@@ -0,0 +1,162 @@
+import os
+import time
+import argparse
+from importlib import metadata
+import spacy
+from spacy.scorer import Scorer
+from spacy.tokens import DocBin
+from spacy.training import Example
+from spacy.util import filter_spans
+from spacy_entity_linker import EntityLinker
+
+# Named model tiers, fastest first
+TIERS = {
+    "sm":  "en_core_web_sm",
+    "md":  "en_core_web_md",
+    "trf": "en_core_web_trf",
+}
+CASCADE = "cascade"
+
+# trf: accurate (the worker's historical default); sm/md: fast;
+# cascade: sm everywhere, trf only on sentences where sm found an entity
+NER_TIER = os.getenv("NER_TIER", "trf")
+
+DEV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dev.spacy")
+
+_pipelines = {}
+
+
+def engine_version(tier=None):
+    """Identity of the models behind a tier, e.g. "trf:en_core_web_trf-3.7.3".
+
+    Read from package metadata, so it is known without loading a model.
+    """
+    tier = tier or NER_TIER
+    names = [TIERS["sm"], TIERS["trf"]] if tier == CASCADE else [TIERS[tier]]
+    parts = []
+    for name in names:
+        try:
+            parts.append(f"{name}-{metadata.version(name)}")
+        except metadata.PackageNotFoundError:
+            parts.append(name)
+    return f"{tier}:" + "+".join(parts)
+
+
+def load_pipeline(tier, link=True):
+    """spaCy pipeline for a tier, loaded once per process."""
+    key = (tier, link)
+    if key not in _pipelines:
+        nlp = spacy.load(TIERS[tier])
+        if link:
+            nlp.add_pipe("entityLinker", last=True)
+        _pipelines[key] = nlp
+    return _pipelines[key]
+
+
+class CascadeNer:
+    """Small model as a pre-filter, transformer only where it matters.
+
+    The sm pipeline tags every document and splits it into sentences;
+    only sentences in which sm found a candidate entity are re-run
+    through trf, whose entities replace sm's for the whole document. The
+    entity linker then runs once on the result. Behaves like a spaCy
+    Language for __call__ and pipe().
+    """
+
+    def __init__(self, link=True, skip_labels=()):
+        self.fast = load_pipeline("sm", link=link)
+        self.precise = load_pipeline("trf", link=False)
+        self.link = link
+        self.skip_labels = set(skip_labels)
+        self.vocab = self.fast.vocab
+        self.stats = {"docs": 0, "sentences": 0, "refined": 0}
+
+    def __call__(self, text):
+        return next(iter(self.pipe([text])))
+
+    def get_pipe(self, name):
+        return self.fast.get_pipe(name)
+
+    def _candidate_sentences(self, doc):
+        return [
+            sent for sent in doc.sents
+            if any(ent.label_ not in self.skip_labels for ent in sent.ents)
+        ]
+
+    def _refine(self, docs, batch_size, link):
+        """Swap in trf entities for the candidate sentences of a group of docs."""
+        work = [(doc, sent) for doc in docs for sent in self._candidate_sentences(doc)]
+        self.stats["docs"] += len(docs)
+        self.stats["sentences"] += sum(1 for doc in docs for _ in doc.sents)
+        self.stats["refined"] += len(work)
+
+        spans = {id(doc): [] for doc in docs}
+        texts = ((sent.text, (doc, sent.start_char)) for doc, sent in work)
+        for sent_doc, (doc, offset) in self.precise.pipe(texts, as_tuples=True, batch_size=batch_size):
+            for ent in sent_doc.ents:
+                span = doc.char_span(offset + ent.start_char, offset + ent.end_char,
+                                     label=ent.label_, alignment_mode="expand")
+                if span is not None:
+                    spans[id(doc)].append(span)
+
+        for doc in docs:
+            doc.ents = filter_spans(spans[id(doc)])
+            if link:
+                self.fast.get_pipe("entityLinker")(doc)
+
+    def pipe(self, items, as_tuples=False, batch_size=8, group_size=64, disable=()):
+        """Like Language.pipe; trf batches are drawn from group_size docs at a time."""
+        link = self.link and "entityLinker" not in disable
+        group = []
+        fast_disable = ["entityLinker"] if self.link else []
+        for item in self.fast.pipe(items, as_tuples=as_tuples, batch_size=group_size, disable=fast_disable):
+            group.append(item)
+            if len(group) >= group_size:
+                self._refine([i[0] for i in group] if as_tuples else group, batch_size, link)
+                yield from group
+                group = []
+        if group:
+            self._refine([i[0] for i in group] if as_tuples else group, batch_size, link)
+            yield from group
+
+
+def load_engine(tier=None, link=True, skip_labels=()):
+    """The configured NER engine: a spaCy pipeline, or CascadeNer."""
+    tier = tier or NER_TIER
+    if tier == CASCADE:
+        return CascadeNer(link=link, skip_labels=skip_labels)
+    if tier not in TIERS:
+        raise ValueError(f"Unknown NER tier {tier!r}; choose from {', '.join([*TIERS, CASCADE])}")
+    return load_pipeline(tier, link=link)
+
+
+def evaluate(tier, gold_docs):
+    """(docs/s, entity P/R/F, engine) of a tier against gold-annotated docs."""
+    engine = load_engine(tier, link=False)
+    texts = [doc.text for doc in gold_docs]
+
+    start = time.perf_counter()
+    predicted = list(engine.pipe(texts, batch_size=8))
+    elapsed = time.perf_counter() - start
+
+    examples = [Example(pred, gold) for pred, gold in zip(predicted, gold_docs)]
+    scores = Scorer.score_spans(examples, "ents")
+    return len(texts) / elapsed, scores, engine
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Report docs/s and entity F1 per NER tier on dev.spacy.")
+    ap.add_argument("--tiers", nargs="*", default=[*TIERS, CASCADE])
+    ap.add_argument("--limit", type=int, default=200)
+    args = ap.parse_args()
+
+    vocab = spacy.blank("en").vocab
+    gold = list(DocBin().from_disk(DEV_PATH).get_docs(vocab))[:args.limit]
+    print(f"{'tier':<8} {'docs/s':>8} {'P':>6} {'R':>6} {'F1':>6}")
+    for tier in args.tiers:
+        rate, scores, engine = evaluate(tier, gold)
+        print(f"{tier:<8} {rate:>8.2f} {scores['ents_p'] or 0:>6.3f} "
+              f"{scores['ents_r'] or 0:>6.3f} {scores['ents_f'] or 0:>6.3f}")
+        if tier == CASCADE:
+            stats = engine.stats
+            print(f"         trf re-ran {stats['refined']} of {stats['sentences']} sentences")
@@ -1,88 +1,375 @@
-import spacy
-from spacy_entity_linker import EntityLinker
-from pymongo import MongoClient, UpdateMany
+from ner_engine import NER_TIER, engine_version, load_engine
+from link_cache import LinkCache, record_of
+from span_alignment import align_spans
+from entity_registry import EntityRegistry, create_indexes, ensure_backfilled
+from pymongo import MongoClient, UpdateOne
 from tqdm import tqdm
+from datetime import datetime
 import os
+import hashlib
+import sys
+import queue
+import signal
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Initialize NLP pipeline
-nlp = spacy.load("en_core_web_trf")
-nlp.add_pipe("entityLinker", last=True)
+# NLP engine (tier chosen by NER_TIER), loaded on first use so shard
+# parents and tools that never run the model don't pay for it
+nlp = None
+
+def get_nlp():
+    global nlp
+    if nlp is None:
+        nlp = load_engine(NER_TIER, skip_labels=EXCLUDED_TYPES)
+    return nlp
+
+# Mention -> Wikidata record cache, opened with the model
+link_cache = None
+
+def get_link_cache():
+    global link_cache
+    if link_cache is None:
+        link_cache = LinkCache()
+    return link_cache
+
+# Canonical entity IDs for extracted entities
+entity_registry = EntityRegistry()
 
 # MongoDB setup
 client = MongoClient(os.getenv("MONGO_URI"))
 db = client["news_db"]
 collection = db["test_articles"]
+checkpoints = db["pipeline_checkpoints"]
 
 # Entity types to exclude
 EXCLUDED_TYPES = {"CARDINAL", "DATE", "PRODUCT"}
 
+# Docs per nlp.pipe batch; small due to transformer memory use
+PIPE_BATCH = 8
+
+# Bump when the extraction logic changes in a way that should re-run old articles
+EXTRACTION_VERSION = 2
+NER_VERSION = f"{EXTRACTION_VERSION}/{engine_version(NER_TIER)}"
+
+def entity_mentions(doc):
+    """First NER entity per lowercased surface form, in document order."""
+    mentions = {}
+    for ent in doc.ents:
+        if ent.label_ not in EXCLUDED_TYPES:
+            mentions.setdefault(ent.text.lower(), ent)
+    return mentions
+
+def linked_records(doc):
+    """Wikidata records the linker found, by lowercased surface form.
+
+    Returns (records, proposed): records only holds linker spans that
+    line up exactly with an NER entity of a kept type; proposed is every
+    surface the linker produced a candidate for, aligned or not.
+    """
+    linked_ents = doc._.linkedEntities
+    spans = [linked_ent.get_span() for linked_ent in linked_ents]
+    records = {}
+    for linked_ent, span, matching_ner in zip(linked_ents, spans, align_spans(spans, doc.ents)):
+        if matching_ner is not None and matching_ner.label_ not in EXCLUDED_TYPES:
+            records.setdefault(span.text.lower(), record_of(linked_ent))
+    return records, {span.text.lower() for span in spans}
+
+def build_entities(mentions, records):
+    return [
+        {"text": ent.text, "type": ent.label_, **records[surface]}
+        for surface, ent in mentions.items() if records.get(surface)
+    ]
+
 def extract_filtered_entities(text):
-    """Extract entities with valid NER labels and Wikidata linking"""
-    doc = nlp(text)
-    entities = []
-    seen_texts = set()
-
-    for linked_ent in doc._.linkedEntities:
-        span = linked_ent.get_span()
-
-        if span.text.lower() in seen_texts:
-            continue
-        seen_texts.add(span.text.lower())
-
-        matching_ner = next(
-            (ent for ent in doc.ents 
-             if ent.start == span.start and ent.end == span.end and ent.label_ not in EXCLUDED_TYPES),
-            None
-        )
-
-        if matching_ner:
-            entities.append({
-                "text": span.text,
-                "type": matching_ner.label_,
-                "wikidata_id": linked_ent.get_id(),
-                "wikidata_url": linked_ent.get_url(),
-                "description": linked_ent.get_description(),
-                "label": linked_ent.get_label()
-            })
-
-    return entities
-
-def process_collection():
-    """Process articles in MongoDB and attach entity information"""
-    query = {"entities": {"$exists": False}, "content": {"$exists": True, "$ne": ""}}
-    total = collection.count_documents(query)
-
-    with tqdm(total=total, desc="Processing Articles") as pbar:
-        batch_size = 200
-        for i in range(0, total, batch_size):
-            batch = list(collection.find(query).skip(i).limit(batch_size))
-            if not batch:
+    """Extract entities with valid NER labels and Wikidata linking.
+
+    Accepts raw text or a Doc that has already been through nlp, in which
+    case the model is not run again.
+    """
+    doc = get_nlp()(text) if isinstance(text, str) else text
+    records, _ = linked_records(doc)
+    return build_entities(entity_mentions(doc), records)
+
+def link_entities(doc, cache):
+    """Linked entities of a Doc that went through the model without the linker.
+
+    When every candidate mention is in the cache the linker is skipped;
+    otherwise it runs on the doc and fills in the surfaces without a
+    cached record. A surface is only cached as unlinkable when the linker
+    proposed nothing for it at all. Both paths build the entity list the
+    way extract_filtered_entities does.
+    """
+    mentions = entity_mentions(doc)
+    records, uncached = {}, set()
+    for surface, ent in mentions.items():
+        found, record = cache.lookup(ent.text)
+        if not found:
+            uncached.add(surface)
+        elif record:
+            records[surface] = record
+
+    if uncached:
+        get_nlp().get_pipe("entityLinker")(doc)
+        linked, proposed = linked_records(doc)
+        for surface, ent in mentions.items():
+            if surface in records:
+                continue   # a cached link is kept
+            if surface in linked:
+                records[surface] = linked[surface]
+                cache.store(ent.text, linked[surface])
+            elif surface in uncached and surface not in proposed:
+                cache.store(ent.text, None)
+    return build_entities(mentions, records)
+
+def extract_entities_batch(articles, batch_size=PIPE_BATCH, cache=None):
+    """Yield (article, entities) for an iterable of article dicts.
+
+    Each article's content goes through the model exactly once, in
+    nlp.pipe batches; the entity linker only runs for articles with a
+    mention that is not in the link cache (the shared one by default).
+    The doc's sentence boundaries are left on the article as "sentences"
+    for the relation stage.
+    """
+    cache = cache or get_link_cache()
+    pairs = ((article["content"], article) for article in articles)
+    try:
+        for doc, article in get_nlp().pipe(pairs, as_tuples=True, batch_size=batch_size,
+                                           disable=["entityLinker"]):
+            entities = link_entities(doc, cache)
+            article["sentences"] = [[sent.start_char, sent.end_char] for sent in doc.sents]
+            yield article, entities
+    finally:
+        cache.flush()
+
+def content_hash(content):
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+def entity_fields(article, entities):
+    """$set fields for an article's extracted entities, stamped with the NER version.
+
+    Registers the entities, which sets their entity_id.
+    """
+    entity_ids = entity_registry.assign(entities)
+    return {
+        "entities": entities,
+        "entity_ids": entity_ids,
+        "sentences": article.get("sentences", []),
+        "ner_meta": {
+            "version": NER_VERSION,
+            "content_hash": content_hash(article["content"]),
+            "extracted_at": datetime.now()
+        }
+    }
+
+# Streaming pipeline settings
+READ_QUEUE_SIZE = 256    # articles buffered ahead of the model
+WRITE_QUEUE_SIZE = 256   # results buffered ahead of Mongo
+WRITE_BATCH = 100        # updates per bulk_write (and per checkpoint)
+CHECKPOINT_ID = "ner_extraction"
+STALE_CHECKPOINT_ID = f"ner_extraction_stale:{NER_VERSION}"
+
+# Articles never processed, articles already processed, and those of them
+# processed by another NER version
+PENDING = {"entities": {"$exists": False}, "content": {"$exists": True, "$ne": ""}}
+EXTRACTED = {"entities": {"$exists": True}, "content": {"$exists": True, "$ne": ""}}
+STALE = {**EXTRACTED, "ner_meta.version": {"$ne": NER_VERSION}}
+
+_DONE = object()
+
+
+def load_checkpoint(checkpoint_id=CHECKPOINT_ID):
+    """_id of the last article the pipeline finished, or None."""
+    state = checkpoints.find_one({"_id": checkpoint_id})
+    return state["last_id"] if state else None
+
+
+def save_checkpoint(last_id, checkpoint_id=CHECKPOINT_ID):
+    checkpoints.update_one(
+        {"_id": checkpoint_id},
+        {"$set": {"last_id": last_id, "updated_at": datetime.now()}},
+        upsert=True
+    )
+
+
+def is_stale(article):
+    """Extracted by another NER version, or from content that has changed since."""
+    meta = article.get("ner_meta") or {}
+    return meta.get("version") != NER_VERSION or meta.get("content_hash") != content_hash(article["content"])
+
+
+def _reader(query, read_q, stop, errors, order=1, keep=None):
+    """Stream articles in _id order (or reverse, order=-1) into the bounded read queue.
+
+    keep, when given, filters articles the query cannot select by itself.
+    """
+    try:
+        projection = {"content": 1, "ner_meta.version": 1, "ner_meta.content_hash": 1}
+        cursor = collection.find(query, projection).sort("_id", order).batch_size(WRITE_BATCH)
+        with cursor:
+            for article in cursor:
+                if stop.is_set():
+                    break
+                if keep is None or keep(article):
+                    read_q.put(article)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        read_q.put(_DONE)
+
+
+def _writer(write_q, pbar, errors, checkpoint_id=CHECKPOINT_ID):
+    """Bulk-write results in _id order, checkpointing after each batch."""
+    updates, last_id = [], None
+
+    def flush():
+        if updates:
+            collection.bulk_write(updates, ordered=False)
+            updates.clear()
+        if last_id is not None:
+            save_checkpoint(last_id, checkpoint_id)
+
+    try:
+        while True:
+            item = write_q.get()
+            if item is _DONE:
                 break
+            article_id, fields = item
+            updates.append(UpdateOne({"_id": article_id}, {"$set": fields}))
+            last_id = article_id
+            pbar.update(1)
+            if pbar.n % WRITE_BATCH == 0:
+                flush()
+        flush()
+    except Exception as e:
+        errors.append(e)
+
+
+def _articles(read_q, stop):
+    """Feed the model from the read queue until the reader is done or a stop is requested."""
+    while not stop.is_set():
+        item = read_q.get()
+        if item is _DONE:
+            return
+        yield item
+
+
+def _drain(read_q, reader):
+    """Discard unprocessed articles so the reader can finish.
+
+    They all come after the checkpoint in _id order, so the next run
+    picks them up again.
+    """
+    while reader.is_alive():
+        try:
+            read_q.get(timeout=0.5)
+        except queue.Empty:
+            pass
+
+
+def process_collection(from_start=False, stale=False):
+    """Process articles in MongoDB and attach entity information.
+
+    Articles are streamed in _id order from the last checkpoint: a reader
+    thread fills a bounded queue, extract_entities_batch consumes it with
+    one model pass per article, and a writer thread bulk-writes the
+    entities and advances the checkpoint. Ctrl+C
+    (or SIGTERM) finishes the batch in flight, writes it and exits; the
+    next run resumes after the checkpoint without rescanning. A run that
+    drains the cursor clears the checkpoint, so articles that become
+    pending again below it are picked up by the next run.
+
+    With stale=True, articles extracted by a different NER_VERSION, or
+    whose content no longer matches ner_meta.content_hash (re-scraped
+    text), are re-processed instead, newest first. Their old entities are
+    only overwritten by the new ones, so search keeps working meanwhile.
+    """
+    checkpoint_id = STALE_CHECKPOINT_ID if stale else CHECKPOINT_ID
+    order = -1 if stale else 1
+    if from_start:
+        checkpoints.delete_one({"_id": checkpoint_id})
+    create_indexes()
+    ensure_backfilled()
+
+    # Content hashes can't be compared in the query, so stale mode reads
+    # every extracted article and is_stale picks the ones to re-run
+    query = dict(EXTRACTED if stale else PENDING)
+    keep = is_stale if stale else None
+    last_id = load_checkpoint(checkpoint_id)
+    if last_id is not None:
+        query["_id"] = {"$lt" if stale else "$gt": last_id}
+        print(f"↪️ Resuming after {last_id}")
+    if stale:
+        outdated = collection.count_documents({**query, **STALE})
+        print(f"♻️ {outdated} articles extracted by an older NER version (now {NER_VERSION}), "
+              f"plus any whose content changed since extraction")
+        total = None
+    else:
+        total = collection.count_documents(query)
+
+    stop = threading.Event()
+    previous_handlers = {}
+
+    def request_stop(signum, frame):
+        print("\n🛑 Stopping after the batch in flight...")
+        stop.set()
+
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[sig] = signal.signal(sig, request_stop)
+
+    read_q = queue.Queue(maxsize=READ_QUEUE_SIZE)
+    write_q = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    errors = []
+    drained = False
+
+    try:
+        with tqdm(total=total, desc="Processing Articles") as pbar:
+            reader = threading.Thread(target=_reader, args=(query, read_q, stop, errors, order, keep), daemon=True)
+            writer = threading.Thread(target=_writer, args=(write_q, pbar, errors, checkpoint_id), daemon=True)
+            reader.start()
+            writer.start()
 
-            texts = [doc["content"] for doc in batch]
-            docs = nlp.pipe(texts, batch_size=8)  # Smaller batch due to transformer memory use
+            try:
+                for article, entities in extract_entities_batch(_articles(read_q, stop)):
+                    while True:
+                        if errors:
+                            raise errors[0]
+                        try:
+                            write_q.put((article["_id"], entity_fields(article, entities)), timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+                # The reader only runs out without a stop request at the end of the cursor
+                drained = not stop.is_set()
+            finally:
+                stop.set()
+                _drain(read_q, reader)
+                while writer.is_alive():
+                    try:
+                        write_q.put(_DONE, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                writer.join()
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
 
-            updates = []
-            for doc, article in zip(docs, batch):
-                entities = extract_filtered_entities(doc.text)
-                if entities:
-                    updates.append(
-                        UpdateMany(
-                            {"_id": article["_id"]},
-                            {"$set": {"entities": entities}}
-                        )
-                    )
-                pbar.update(1)
+    if errors:
+        raise errors[0]
+    if drained:
+        # Processed articles drop out of the query by themselves
+        checkpoints.delete_one({"_id": checkpoint_id})
+    if link_cache is not None:
+        print(f"🔗 Link cache hit rate: {link_cache.hit_rate():.1%}")
+    return pbar.n
 
-            if updates:
-                collection.bulk_write(updates, ordered=False)
 
 if __name__ == "__main__":
-    process_collection()
-    print("✅ Processing complete!")
+    processed = process_collection(from_start="--from-start" in sys.argv, stale="--stale" in sys.argv)
+    print(f"✅ Processing complete! ({processed} articles)")
 
 
 
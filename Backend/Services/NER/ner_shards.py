@@ -0,0 +1,192 @@
+import os
+import time
+import uuid
+import queue
+import signal
+import argparse
+import multiprocessing
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from ner_extraction import PENDING, collection, entity_fields, extract_entities_batch
+from entity_registry import create_indexes, ensure_backfilled
+
+
+DEFAULT_WORKERS = int(os.getenv("NER_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+CLAIM_BATCH = 32          # articles claimed (and written) at a time
+CLAIM_TTL = 600           # seconds before an abandoned claim can be taken over
+REPORT_EVERY = 10         # seconds between progress tables
+
+
+def plan_shards(n):
+    """Split the pending _id space into n ranges of roughly equal size."""
+    buckets = list(collection.aggregate([
+        {"$match": PENDING},
+        {"$bucketAuto": {"groupBy": "$_id", "buckets": n}},
+    ]))
+    shards = []
+    for i, bucket in enumerate(buckets):
+        last = i == len(buckets) - 1
+        # $bucketAuto bounds are [min, max) except for the last bucket, which includes max
+        shards.append({
+            "shard": i,
+            "min": bucket["_id"]["min"],
+            "max": bucket["_id"]["max"],
+            "inclusive": last,
+            "total": bucket["count"],
+        })
+    return shards
+
+
+def _claim(shard, after, token):
+    """Claim the next batch of unclaimed (or expired) articles in the shard's range.
+
+    Returns the claimed articles in _id order; another process holding a
+    live claim on an article means it is simply skipped here.
+    """
+    now = datetime.now(timezone.utc)
+    upper = "$lte" if shard["inclusive"] else "$lt"
+    id_range = {"$gt": after} if after is not None else {"$gte": shard["min"]}
+    id_range[upper] = shard["max"]
+    claimable = {"$or": [{"ner_claim": {"$exists": False}}, {"ner_claim.expires": {"$lt": now}}]}
+
+    candidates = [
+        doc["_id"] for doc in
+        collection.find({**PENDING, **claimable, "_id": id_range}, {"_id": 1})
+        .sort("_id", 1).limit(CLAIM_BATCH)
+    ]
+    if not candidates:
+        return [], None
+
+    collection.update_many(
+        {"_id": {"$in": candidates}, **claimable},
+        {"$set": {"ner_claim": {"token": token, "expires": now + timedelta(seconds=CLAIM_TTL)}}}
+    )
+    claimed = list(
+        collection.find({"_id": {"$in": candidates}, "ner_claim.token": token}, {"content": 1})
+        .sort("_id", 1)
+    )
+    return claimed, candidates[-1]
+
+
+def _lag(article_id):
+    """Seconds between an article's insertion and now."""
+    return (datetime.now(timezone.utc) - article_id.generation_time).total_seconds()
+
+
+def run_shard(shard, progress, stop, threads):
+    """Worker process: load the pipeline once, then claim, extract and write."""
+    # Ctrl+C goes to the whole process group; the parent asks us to stop via `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    token = f"{shard['shard']}-{uuid.uuid4().hex}"
+    processed, started, after = 0, time.monotonic(), None
+
+    while not stop.is_set():
+        articles, after_batch = _claim(shard, after, token)
+        if after_batch is None:
+            break
+        after = after_batch
+
+        updates = []
+        for article, entities in extract_entities_batch(articles):
+            update = {"$unset": {"ner_claim": ""}, "$set": entity_fields(article, entities)}
+            updates.append(UpdateOne({"_id": article["_id"], "ner_claim.token": token}, update))
+        if updates:
+            collection.bulk_write(updates, ordered=False)
+
+        processed += len(articles)
+        progress.put({
+            "shard": shard["shard"],
+            "processed": processed,
+            "elapsed": time.monotonic() - started,
+            "lag": _lag(articles[-1]["_id"]) if articles else None,
+            "done": False,
+        })
+
+    progress.put({"shard": shard["shard"], "processed": processed,
+                  "elapsed": time.monotonic() - started, "lag": None, "done": True})
+
+
+def print_report(shards, latest):
+    print(f"\n{'shard':>5} {'done':>13} {'docs/s':>8} {'remaining':>10} {'lag':>10}")
+    for shard in shards:
+        state = latest.get(shard["shard"], {})
+        processed = state.get("processed", 0)
+        elapsed = state.get("elapsed") or 0
+        rate = processed / elapsed if elapsed else 0.0
+        remaining = max(0, shard["total"] - processed)
+        lag = "finished" if state.get("done") else (
+            f"{state['lag'] / 3600:.1f}h" if state.get("lag") is not None else "-"
+        )
+        print(f"{shard['shard']:>5} {processed:>6}/{shard['total']:<6} {rate:>8.2f} "
+              f"{remaining:>10} {lag:>10}")
+    total = sum(s.get("processed", 0) for s in latest.values())
+    print(f"📊 {total} articles processed across {len(shards)} shards")
+
+
+def run_sharded(workers=DEFAULT_WORKERS):
+    """Process pending articles with one model-loading process per shard.
+
+    The pending _id space is split with $bucketAuto. Each process claims
+    its articles in small batches (token + TTL claim markers), so two
+    processes - or two runs - never work on the same article, and claims
+    left behind by a crashed process expire after CLAIM_TTL.
+    """
+    create_indexes()
+    ensure_backfilled()
+    shards = plan_shards(workers)
+    if not shards:
+        print("✅ No pending articles")
+        return 0
+
+    print(f"🧩 {sum(s['total'] for s in shards)} pending articles in {len(shards)} shards")
+    ctx = multiprocessing.get_context("spawn")   # fresh interpreter: own Mongo client and model
+    progress, stop = ctx.Queue(), ctx.Event()
+    threads = max(1, (os.cpu_count() or 1) // len(shards))
+    procs = [
+        ctx.Process(target=run_shard, args=(shard, progress, stop, threads), daemon=True)
+        for shard in shards
+    ]
+    for p in procs:
+        p.start()
+
+    latest, last_report = {}, time.monotonic()
+    try:
+        while any(p.is_alive() for p in procs) or not progress.empty():
+            try:
+                update = progress.get(timeout=1)
+                latest[update["shard"]] = update
+            except queue.Empty:
+                pass
+            if time.monotonic() - last_report >= REPORT_EVERY:
+                print_report(shards, latest)
+                last_report = time.monotonic()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping shards after their current batch...")
+        stop.set()
+        for p in procs:
+            p.join()
+        while not progress.empty():
+            update = progress.get()
+            latest[update["shard"]] = update
+    for p in procs:
+        p.join()
+
+    print_report(shards, latest)
+    failed = [p.exitcode for p in procs if p.exitcode]
+    if failed:
+        print(f"⚠️ {len(failed)} shard process(es) exited with errors")
+    return sum(s.get("processed", 0) for s in latest.values())
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run NER over pending articles in parallel shards.")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = ap.parse_args()
+    processed = run_sharded(args.workers)
+    print(f"✅ Processing complete! ({processed} articles)")
@@ -0,0 +1,76 @@
+import time
+import random
+import argparse
+from collections import namedtuple
+
+
+def align_spans(spans, ents, enclosing=False):
+    """Match each span to an NER entity in one sorted-merge pass.
+
+    spans and ents are anything with token `start`/`end` (spaCy Spans);
+    ents must be non-overlapping, as doc.ents always is. Returns a list
+    parallel to spans holding the entity with the same bounds, or with
+    enclosing=True the entity that contains the span, else None.
+    """
+    ents = sorted(ents, key=lambda e: e.start)
+    out = [None] * len(spans)
+    i = 0
+    for k in sorted(range(len(spans)), key=lambda k: spans[k].start):
+        span = spans[k]
+        while i < len(ents) and ents[i].end <= span.start:
+            i += 1
+        if i == len(ents):
+            break
+        ent = ents[i]
+        if ent.start == span.start and ent.end == span.end:
+            out[k] = ent
+        elif enclosing and ent.start <= span.start and span.end <= ent.end:
+            out[k] = ent
+    return out
+
+
+# ====== Micro-benchmark ======
+Span = namedtuple("Span", "start end")
+
+
+def synthetic_article(n_ents, seed=0):
+    """Token spans for an article with n_ents entities, about half of them linked."""
+    rng = random.Random(seed)
+    ents, pos = [], 0
+    for _ in range(n_ents):
+        pos += rng.randint(3, 30)
+        length = rng.randint(1, 4)
+        ents.append(Span(pos, pos + length))
+        pos += length
+    linked = [e for e in ents if rng.random() < 0.5]
+    # The linker also resolves noun chunks that are not NER entities
+    linked += [Span(e.end + 1, e.end + 2) for e in ents if rng.random() < 0.5]
+    linked.sort()
+    return linked, ents
+
+
+def linear_scan(spans, ents):
+    return [next((e for e in ents if e.start == s.start and e.end == s.end), None) for s in spans]
+
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Compare linear-scan and sorted-merge span alignment.")
+    ap.add_argument("--sizes", type=int, nargs="*", default=[50, 200, 1000, 5000],
+                    help="entities per synthetic article")
+    args = ap.parse_args()
+
+    print(f"{'ents':>6} {'linked':>7} {'scan ms':>9} {'merge ms':>9} {'speedup':>8}")
+    for n in args.sizes:
+        spans, ents = synthetic_article(n)
+        assert linear_scan(spans, ents) == align_spans(spans, ents)
+        scan, merge = timed(linear_scan, spans, ents), timed(align_spans, spans, ents)
+        print(f"{n:>6} {len(spans):>7} {scan * 1000:>9.2f} {merge * 1000:>9.2f} {scan / merge:>7.1f}x")
@@ -1,6 +1,23 @@
-import cupy
-print(cupy.cuda.runtime.getDeviceCount())
-
+import argparse
+# Single-pass extraction API: the model runs once per article, and
+# extract_filtered_entities also accepts an already-processed Doc
+from ner_extraction import extract_entities_batch, extract_filtered_entities, process_collection
+from ner_shards import DEFAULT_WORKERS, run_sharded
 
 
+# NER worker entry point; the pipeline itself lives in ner_extraction.py
+# (checkpointed streaming cursor) and ner_shards.py (parallel shards)
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Extract entities for pending articles.")
+    ap.add_argument("--from-start", action="store_true", help="ignore the saved checkpoint")
+    ap.add_argument("--stale", action="store_true",
+                    help="re-process articles extracted by an older NER version or from since-changed content")
+    ap.add_argument("--workers", type=int, default=1,
+                    help=f"parallel shard processes (e.g. {DEFAULT_WORKERS}); 1 streams in this process")
+    args = ap.parse_args()
 
+    if args.workers > 1 and not args.stale:
+        processed = run_sharded(args.workers)
+    else:
+        processed = process_collection(from_start=args.from_start, stale=args.stale)
+    print(f"✅ Processing complete! ({processed} articles)")
@@ -13,6 +13,10 @@ MONGO_URI = os.getenv("MONGO_URI")
 client = MongoClient(MONGO_URI)
 db = client["news_db"]
 collection = db["test_articles"]
+aliases = db["entity_aliases"]
+
+# Alias matches counted as partial matches of the searched entity
+MAX_ALIAS_MATCHES = 200
 
 # Neo4j Connection
 NEO4J_URI = os.getenv("NEO4J_URI")
@@ -126,72 +130,58 @@ def get_related_entities(entity_name):
             "main_entity": main_entity or {"id": entity_name, "type": "UNKNOWN", "normalized_label": entity_name}
         }
 
+# === MongoDB: Entity Registry Lookups ===
+def lookup_entity_ids(names):
+    """Registry IDs of the entities known under any of the given names."""
+    normalized = list({normalize_entity_name(name) for name in names if name})
+    return {
+        entity_id
+        for alias in aliases.find({"_id": {"$in": normalized}})
+        for entity_id in alias["entity_ids"]
+    }
+
+def lookup_partial_entity_ids(name):
+    """Registry IDs of entities with a surface form starting with the name."""
+    # Anchored, so the prefix is looked up on the _id index instead of scanning every alias
+    regex = re.compile("^" + re.escape(normalize_entity_name(name)))
+    return {
+        entity_id
+        for alias in aliases.find({"_id": regex}).limit(MAX_ALIAS_MATCHES)
+        for entity_id in alias["entity_ids"]
+    }
+
+def count_entities_in(ids):
+    """Aggregation expression: how many of an article's entities have one of the IDs."""
+    return {"$size": {
+        "$filter": {
+            "input": "$entities",
+            "as": "ent",
+            "cond": {"$in": ["$$ent.entity_id", list(ids)]}
+        }
+    }}
+
 # === MongoDB: Search Articles with Ranking ===
 def search_articles_by_entity(entity_name, related_entities):
     """Fetch articles mentioning the entity & related entities, ranked by relevance."""
-    # Create search terms including both raw and normalized versions
-    search_terms = list({
-        entity_name,
-        *[e["id"] for e in related_entities],
-        *[normalize_entity_name(e["id"]) for e in related_entities]
-    })
+    # Everything below matches on registry IDs rather than entity names
+    main_ids = lookup_entity_ids([entity_name])
+    partial_ids = lookup_partial_entity_ids(entity_name)
+    related_ids = lookup_entity_ids([e["id"] for e in related_entities]) - main_ids
+    search_ids = list(main_ids | related_ids)
+    if not search_ids:
+        return []
     
     pipeline = [
-        {"$match": {
-            "$or": [
-                {"entities.label": {"$in": search_terms}},
-                {"entities.text": {"$in": search_terms}}
-            ]
-        }},
+        {"$match": {"entity_ids": {"$in": search_ids}}},
         {"$addFields": {
             "entity_match_score": {
                 "$sum": [
                     # Exact match to the main entity (highest weight)
-                    {"$size": {
-                        "$filter": {
-                            "input": "$entities",
-                            "as": "ent",
-                            "cond": {
-                                "$or": [
-                                    {"$eq": ["$$ent.label", entity_name]},
-                                    {"$eq": ["$$ent.text", entity_name]}
-                                ]
-                            }
-                        }
-                    }},
+                    count_entities_in(main_ids),
                     # Partial matches to main entity (medium weight)
-                    {"$multiply": [
-                        0.7,
-                        {"$size": {
-                            "$filter": {
-                                "input": "$entities",
-                                "as": "ent",
-                                "cond": {
-                                    "$regexMatch": {
-                                        "input": "$$ent.text",
-                                        "regex": f".*{re.escape(entity_name)}.*",
-                                        "options": "i"
-                                    }
-                                }
-                            }
-                        }}
-                    ]},
+                    {"$multiply": [0.7, count_entities_in(partial_ids)]},
                     # Matches to related entities (lower weight)
-                    {"$multiply": [
-                        0.5,
-                        {"$size": {
-                            "$filter": {
-                                "input": "$entities",
-                                "as": "ent",
-                                "cond": {
-                                    "$or": [
-                                        {"$in": ["$$ent.label", search_terms[1:]]},
-                                        {"$in": ["$$ent.text", search_terms[1:]]}
-                                    ]
-                                }
-                            }
-                        }}
-                    ]}
+                    {"$multiply": [0.5, count_entities_in(related_ids)]}
                 ]
             },
             # Add normalized entity information
@@ -199,12 +189,7 @@ def search_articles_by_entity(entity_name, related_entities):
                 "$filter": {
                     "input": "$entities",
                     "as": "ent",
-                    "cond": {
-                        "$or": [
-                            {"$in": ["$$ent.label", search_terms]},
-                            {"$in": ["$$ent.text", search_terms]}
-                        ]
-                    }
+                    "cond": {"$in": ["$$ent.entity_id", search_ids]}
                 }
             }
         }},
@@ -215,7 +200,9 @@ def search_articles_by_entity(entity_name, related_entities):
             "url": 1,
             "date": 1,
             "_id": 1,
-            "images": 1,
+            "image": 1,
+            # Only legacy articles without a precomputed image need the full list
+            "images": {"$cond": [{"$ifNull": ["$image", False]}, "$$REMOVE", "$images"]},
             "matched_entities": 1,
             "entity_match_score": 1
         }}
@@ -224,6 +211,7 @@ def search_articles_by_entity(entity_name, related_entities):
     articles = list(collection.aggregate(pipeline))
 
     def get_best_image(images):
+        """Fallback for articles scraped before the display image was precomputed."""
         if not images:
             return None
         resolution_order = ['1536', '1586', '1526', '1024', '840', '800', '640', '480', '320', '240']
@@ -247,6 +235,7 @@ def search_articles_by_entity(entity_name, related_entities):
             normalized_label = ent.get("label", ent["text"])
             normalized_matches.append({
                 "original_text": ent["text"],
+                "entity_id": ent.get("entity_id"),
                 "normalized_label": normalized_label,
                 "type": ent.get("type"),
                 "wikidata_id": ent.get("wikidata_id"),
@@ -258,7 +247,7 @@ def search_articles_by_entity(entity_name, related_entities):
             "title": article["title"],
             "url": article["url"],
             "date": article.get("date"),
-            "image": get_best_image(article.get("images", [])),
+            "image": article.get("image") or get_best_image(article.get("images", [])),
             "matched_entities": normalized_matches,
             "match_score": article.get("entity_match_score", 0)
         })
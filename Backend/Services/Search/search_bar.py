@@ -10,6 +10,10 @@ MONGO_URI = os.getenv("MONGO_URI")
 client = MongoClient(MONGO_URI)
 db = client["news_db"]
 collection = db["test_articles"]  # Changed to test_articles
+aliases = db["entity_aliases"]
+
+# Alias matches considered per suggestion query
+MAX_ALIAS_MATCHES = 200
 
 def normalize_entity_name(entity_name):
     """Helper function to normalize entity names for comparison"""
@@ -21,40 +25,43 @@ def suggest_entities(query):
         return {"results": []}  # Single-level response
 
     normalized_query = normalize_entity_name(query)
-    regex = re.compile(f".*{re.escape(normalized_query)}.*", re.IGNORECASE)
-
-    pipeline = [
-        {"$unwind": "$entities"},
-        {"$match": {
-            "$or": [
-                {"entities.text": regex},
-                {"entities.label": regex}
-            ],
-            "entities.text": {"$exists": True},
-            "entities.label": {"$exists": True}
-        }},
-        {"$group": {
-            "_id": "$entities.label",
-            "type": {"$first": "$entities.type"},
-            "count": {"$sum": 1},
-            "sample_text": {"$first": "$entities.text"},
-            "wikidata_id": {"$first": "$entities.wikidata_id"},
-            "description": {"$first": "$entities.description"}
-        }},
-        {"$sort": {"count": -1, "_id": 1}},
-        {"$limit": 10},
-        {"$project": {
-            "text": "$sample_text",  # Display text
-            "label": "$_id",         # Normalized label
-            "type": 1,
-            "count": 1,
-            "wikidata_id": 1,
-            "description": 1,
-            "_id": 0
-        }}
-    ]
+    regex = re.compile(re.escape(normalized_query))
 
     try:
+        # Surface forms are stored normalized, so only the (small) alias table is scanned
+        entity_ids = list({
+            entity_id
+            for alias in aliases.find({"_id": regex}).limit(MAX_ALIAS_MATCHES)
+            for entity_id in alias["entity_ids"]
+        })
+        if not entity_ids:
+            return {"results": []}
+
+        pipeline = [
+            {"$match": {"entity_ids": {"$in": entity_ids}}},
+            {"$unwind": "$entity_ids"},
+            {"$match": {"entity_ids": {"$in": entity_ids}}},
+            {"$group": {"_id": "$entity_ids", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": 10},
+            {"$lookup": {
+                "from": "entity_registry",
+                "localField": "_id",
+                "foreignField": "_id",
+                "as": "entity"
+            }},
+            {"$unwind": "$entity"},
+            {"$project": {
+                "text": "$entity.text",      # Display text
+                "label": "$entity.label",    # Normalized label
+                "entity_id": "$_id",
+                "type": "$entity.type",
+                "count": 1,
+                "wikidata_id": "$entity.wikidata_id",
+                "description": "$entity.description",
+                "_id": 0
+            }}
+        ]
         suggestions = list(collection.aggregate(pipeline))
         return {"results": suggestions}  # Single-level response
     